@@ -0,0 +1,176 @@
+"""
+Batch Runner - Runs many dialogues concurrently under global and per-provider caps
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+from pydantic import BaseModel
+
+from config import DialogueConfig
+from dialogue_manager import DialogueManager
+from metrics import MetricsRegistry
+from response_cache import ResponseCache
+
+DEFAULT_MESSAGE = "Hello! Let's have an interesting conversation about artificial intelligence and its future."
+
+class BatchJob(BaseModel):
+    """One line of a batch spec"""
+    llm1: str
+    llm2: str
+    rounds: int = 2
+    message: str = DEFAULT_MESSAGE
+    id: Optional[str] = None
+
+def load_jobs(path: str) -> List[BatchJob]:
+    """Read a JSONL batch spec, numbering jobs that have no id"""
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                job = BatchJob(**json.loads(line))
+            except Exception as e:
+                raise ValueError(f"{path}:{line_number}: invalid job: {e}") from e
+            job.id = job.id or f"job-{len(jobs) + 1:04d}"
+            jobs.append(job)
+    return jobs
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile, e.g. fraction=0.95 for p95"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+class BatchRunner:
+    """Runs batch jobs as concurrent dialogues and writes one result per job
+
+    ``max_concurrency`` bounds how many dialogues run at once.
+    ``per_provider_concurrency`` bounds in-flight requests per provider
+    across all of them, so one slow or rate-limited provider does not
+    monopolise the batch.
+    """
+
+    def __init__(self, output_dir: str, max_concurrency: int = 8, per_provider_concurrency: int = 4,
+                 judge_model: str = "kimi-k2", cache: ResponseCache = None, dialogue_options: Dict[str, Any] = None,
+                 prometheus: bool = False):
+        self.output_dir = output_dir
+        self.max_concurrency = max_concurrency
+        self.per_provider_concurrency = per_provider_concurrency
+        self.judge_model = judge_model
+        self.cache = cache
+        self.dialogue_options = dialogue_options or {}
+        self.prometheus = prometheus
+        self.metrics = MetricsRegistry()
+        self._provider_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slots_for(self, provider) -> asyncio.Semaphore:
+        if provider.provider_id not in self._provider_slots:
+            self._provider_slots[provider.provider_id] = asyncio.Semaphore(self.per_provider_concurrency)
+        return self._provider_slots[provider.provider_id]
+
+    async def _run_job(self, job: BatchJob, job_slots: asyncio.Semaphore) -> Dict[str, Any]:
+        async with job_slots:
+            started = time.perf_counter()
+            record = {"id": job.id, "llm1": job.llm1, "llm2": job.llm2, "rounds": job.rounds}
+            manager = None
+            try:
+                config = DialogueConfig(rounds=job.rounds, stream=False, output="quiet",
+                                        judge_model=self.judge_model, **self.dialogue_options)
+                manager = DialogueManager(job.llm1, job.llm2, config, self.cache, self.metrics)
+                # An ensemble judge calls each member's provider
+                judges = getattr(manager.judge, "judges", [manager.judge])
+                for provider in (manager.llm1, manager.llm2, *(judge.judge_llm for judge in judges)):
+                    if provider is not None:
+                        provider.request_slots = self._slots_for(provider)
+
+                await manager.arun_dialogue(job.message, job.rounds)
+
+                safe_id = re.sub(r"[^\w.-]", "_", job.id)
+                record["transcript"] = manager.save_conversation(f"{safe_id}.jsonl", self.output_dir)
+                record["judge"] = os.path.join(self.output_dir, f"{safe_id}.judge.json")
+                with open(record["judge"], "w", encoding="utf-8") as f:
+                    json.dump(manager.evaluation, f, ensure_ascii=False, indent=2)
+
+                record["status"] = ("converged" if manager.stop_reason.startswith("converged") else "stopped") \
+                    if manager.stop_reason else "completed"
+                record["error"] = manager.stop_reason
+                record["overall_score"] = (manager.evaluation or {}).get("overall_score")
+                # The judge scores participants by display name; report them by LLM key
+                scores = (manager.evaluation or {}).get("participant_scores") or {}
+                record["participant_scores"] = {job.llm1: scores.get(manager.llm1.name),
+                                                job.llm2: scores.get(manager.llm2.name)}
+                record["turn_latencies"] = [msg["metrics"]["latency"] for msg in manager.conversation_history
+                                            if msg.get("metrics")]
+                record["summary"] = manager.get_conversation_summary()
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = str(e)
+                record["turn_latencies"] = []
+            finally:
+                if manager is not None:
+                    manager.close()
+            record["duration"] = round(time.perf_counter() - started, 3)
+            return record
+
+    async def arun(self, jobs: List[BatchJob], append: bool = False,
+                   on_record: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """Run every job and write ``results.jsonl`` and ``metrics.json`` to the output directory
+        
+        With ``append`` the results of an earlier run are kept, and
+        ``on_record`` is called with each record as soon as its job finishes,
+        before it is written, so it may update the record.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._provider_slots = {}
+        job_slots = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+        results_path = os.path.join(self.output_dir, "results.jsonl")
+        records = []
+        with open(results_path, "a" if append else "w", encoding="utf-8") as results:
+            # Write each record as soon as its job finishes so partial batches keep their results
+            for finished in asyncio.as_completed([self._run_job(job, job_slots) for job in jobs]):
+                record = await finished
+                if on_record is not None:
+                    on_record(record)
+                records.append(record)
+                results.write(json.dumps(record, ensure_ascii=False) + "\n")
+                results.flush()
+        summary = self.summarize(records, time.perf_counter() - started, results_path)
+        summary["metrics"] = os.path.join(self.output_dir, "metrics.json")
+        self.metrics.write(summary["metrics"], os.path.join(self.output_dir, "metrics.prom") if self.prometheus else None)
+        return summary
+
+    def run(self, jobs: List[BatchJob]) -> Dict[str, Any]:
+        return asyncio.run(self.arun(jobs))
+
+    @staticmethod
+    def summarize(records: List[Dict[str, Any]], elapsed: float, results_path: str) -> Dict[str, Any]:
+        """Throughput, failures and turn latency percentiles for a batch"""
+        latencies = [latency for record in records for latency in record["turn_latencies"]]
+        tokens = sum(totals["completion_tokens"]
+                     for record in records
+                     for totals in record.get("summary", {}).get("usage", {}).values())
+        return {
+            "jobs": len(records),
+            "completed": sum(record["status"] == "completed" for record in records),
+            "converged": sum(record["status"] == "converged" for record in records),
+            "stopped": sum(record["status"] == "stopped" for record in records),
+            "failed": sum(record["status"] == "failed" for record in records),
+            "unrated": sum(record["status"] == "unrated" for record in records),
+            "turns": len(latencies),
+            "elapsed": round(elapsed, 2),
+            "jobs_per_minute": round(len(records) / elapsed * 60, 1) if elapsed else None,
+            "turns_per_second": round(len(latencies) / elapsed, 2) if elapsed else None,
+            "completion_tokens_per_second": round(tokens / elapsed, 1) if elapsed else None,
+            "p50_turn_latency": percentile(latencies, 0.50),
+            "p95_turn_latency": percentile(latencies, 0.95),
+            "results": results_path
+        }
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Orchestration benchmark - measures DialogueManager overhead with offline mock providers
+
+Run from the repository root:
+
+    python benchmarks/bench_orchestration.py --rounds 20 --dialogues 8
+
+"Overhead" runs use zero-latency mocks, so the time per turn is what the
+dialogue loop itself costs: history handling, context building, metrics,
+rendering (to a silenced console) and the judge call. "Concurrency" runs give
+every response a fixed latency and compare running the dialogues one after
+another with running them together via ``arun_dialogue``.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+from rich.table import Table
+
+import dialogue_manager
+import judge_model
+from config import DEFAULT_LLMS, DialogueConfig, LLMConfig
+from dialogue_manager import DialogueManager
+
+def register_mock(name: str, **options) -> str:
+    """Add a mock LLM to DEFAULT_LLMS so DialogueManager can look it up"""
+    DEFAULT_LLMS[name] = LLMConfig(name=name, model=name, provider="mock", api_key="",
+                                   options=dict({"mode": "synthetic", "response_words": 80}, **options))
+    return name
+
+def run_sync(rounds: int, stream: bool, context_policy: str) -> float:
+    llm = register_mock("bench-instant")
+    config = DialogueConfig(rounds=rounds, stream=stream, context_policy=context_policy,
+                            max_context_tokens=1000, judge_model=llm)
+    started = time.perf_counter()
+    DialogueManager(llm, llm, config).run_dialogue("Let's benchmark.", rounds)
+    return time.perf_counter() - started
+
+def run_concurrent(dialogues: int, rounds: int, latency: float, concurrent: bool) -> float:
+    llm = register_mock("bench-latency", latency_mean=latency)
+    config = DialogueConfig(rounds=rounds, stream=True, judge_model=llm)
+    managers = [DialogueManager(llm, llm, config) for _ in range(dialogues)]
+
+    async def run_all():
+        if concurrent:
+            await asyncio.gather(*(manager.arun_dialogue("Let's benchmark.", rounds) for manager in managers))
+        else:
+            for manager in managers:
+                await manager.arun_dialogue("Let's benchmark.", rounds)
+
+    started = time.perf_counter()
+    asyncio.run(run_all())
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="Rounds per dialogue")
+    parser.add_argument("--dialogues", type=int, default=8, help="Dialogues in the concurrency runs")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock time to first token in the concurrency runs")
+    options = parser.parse_args()
+
+    # Keep rendering in the measurement but off the terminal
+    dialogue_manager.console.quiet = True
+    judge_model.console.quiet = True
+
+    turns = options.rounds * 2
+    overhead = Table(title=f"Orchestration overhead ({options.rounds} rounds, zero-latency mock)")
+    overhead.add_column("Mode", style="cyan")
+    overhead.add_column("Total (ms)", justify="right")
+    overhead.add_column("Per turn (ms)", justify="right", style="green")
+    for label, stream, policy in [("no-stream, full context", False, "full"),
+                                  ("stream, full context", True, "full"),
+                                  ("stream, sliding window", True, "sliding_window")]:
+        elapsed = run_sync(options.rounds, stream, policy)
+        overhead.add_row(label, f"{elapsed * 1000:.1f}", f"{elapsed * 1000 / turns:.2f}")
+
+    sequential = run_concurrent(options.dialogues, options.rounds, options.latency, concurrent=False)
+    concurrent = run_concurrent(options.dialogues, options.rounds, options.latency, concurrent=True)
+    concurrency = Table(title=f"{options.dialogues} dialogues x {options.rounds} rounds, {options.latency * 1000:.0f} ms per response")
+    concurrency.add_column("Mode", style="cyan")
+    concurrency.add_column("Wall (s)", justify="right")
+    concurrency.add_column("Speedup", justify="right", style="green")
+    concurrency.add_row("sequential", f"{sequential:.2f}", "1.0x")
+    concurrency.add_row("asyncio.gather", f"{concurrent:.2f}", f"{sequential / concurrent:.1f}x")
+
+    console = Console()
+    console.print(overhead)
+    console.print(concurrency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark - measures CLI start-up time per subcommand
+
+Run from the repository root:
+
+    python benchmarks/startup_time.py --runs 5
+
+For every subcommand it reports the median wall time, the import time taken
+from ``python -X importtime`` and which provider SDKs were loaded. The
+"eager SDK imports" row is what every command paid before the SDKs were
+loaded lazily, so it is the start-up saving for commands that never call a
+provider.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SDK_MODULES = ("openai", "anthropic", "groq")
+
+COMMANDS = {
+    "--help": ["main.py", "--help"],
+    "list-llms": ["main.py", "list-llms"],
+    "setup": ["main.py", "setup"],
+    "start --help": ["main.py", "start", "--help"],
+    "evaluate --help": ["main.py", "evaluate", "--help"],
+    "eager SDK imports": ["-c", "import " + ", ".join(SDK_MODULES)],
+}
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Map top-level module name to its cumulative import time in microseconds"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  "):
+            continue  # nested import, already counted by its parent
+        try:
+            modules[name.strip()] = int(cumulative)
+        except ValueError:
+            pass  # header line
+    return modules
+
+def measure(args: List[str], runs: int) -> Dict[str, object]:
+    """Time a command and inspect what it imported"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    wall_times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        wall_times.append(time.perf_counter() - started)
+
+    traced = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = parse_importtime(traced.stderr)
+    return {
+        "wall_ms": statistics.median(wall_times) * 1000,
+        "import_ms": sum(modules.values()) / 1000,
+        "sdks": [name for name in SDK_MODULES if name in modules],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per command")
+    options = parser.parse_args()
+
+    results = {label: measure(args, options.runs) for label, args in COMMANDS.items()}
+    eager_ms = results["eager SDK imports"]["import_ms"]
+
+    table = Table(title=f"CLI start-up (median of {options.runs} runs)")
+    table.add_column("Command", style="cyan")
+    table.add_column("Wall (ms)", justify="right")
+    table.add_column("Imports (ms)", justify="right")
+    table.add_column("SDKs loaded", style="magenta")
+    table.add_column("Saved vs eager (ms)", justify="right", style="green")
+    for label, result in results.items():
+        saved = "" if result["sdks"] or label == "eager SDK imports" else f"{eager_ms:.0f}"
+        table.add_row(label, f"{result['wall_ms']:.0f}", f"{result['import_ms']:.0f}",
+                      ", ".join(result["sdks"]) or "none", saved)
+    Console().print(table)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Client Pool - Shares pooled, keep-alive HTTP clients between LLM providers
+"""
+
+import asyncio
+import atexit
+import hashlib
+import importlib.util
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from config import ClientPoolConfig
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+ClientKey = Tuple[str, str, str, bool, int]
+
+class ClientRegistry:
+    """Hands out one shared SDK client per provider, API key and base URL"""
+
+    def __init__(self, pool_config: ClientPoolConfig = None):
+        self.pool_config = pool_config or ClientPoolConfig()
+        self._lock = threading.Lock()
+        self._clients: Dict[ClientKey, Any] = {}
+        self._http_clients: Dict[ClientKey, Any] = {}
+        self._loops: Dict[ClientKey, asyncio.AbstractEventLoop] = {}
+        self._stats: Dict[ClientKey, Dict[str, Any]] = {}
+
+    def configure(self, pool_config: ClientPoolConfig):
+        """Change the pool limits used for clients created from now on"""
+        with self._lock:
+            self.pool_config = pool_config
+
+    def get_client(self, provider: str, api_key: str, base_url: Optional[str],
+                   factory: Callable[[Any], Any], asynchronous: bool = False) -> Any:
+        """Return the shared client for this provider, creating it on first use
+
+        ``factory`` receives the pooled httpx client and returns the SDK client.
+        Async clients are additionally keyed by the running event loop, because
+        an httpx.AsyncClient's connections cannot be shared across loops.
+        """
+        loop = asyncio.get_running_loop() if asynchronous else None
+        key = (provider, _fingerprint(api_key), base_url or "", asynchronous, id(loop))
+
+        with self._lock:
+            if asynchronous:
+                self._drop_closed_loops()
+            if key in self._clients:
+                self._stats[key]["handouts"] += 1
+                return self._clients[key]
+
+            stats = {
+                "provider": provider,
+                "api_key": key[1],
+                "base_url": base_url,
+                "asynchronous": asynchronous,
+                "http2": self.pool_config.http2 and HTTP2_AVAILABLE,
+                "handouts": 1,
+                "requests": 0
+            }
+            http_client = self._build_http_client(stats, asynchronous)
+            self._http_clients[key] = http_client
+            self._clients[key] = factory(http_client)
+            self._stats[key] = stats
+            if loop is not None:
+                self._loops[key] = loop
+            return self._clients[key]
+
+    def _build_http_client(self, stats: Dict[str, Any], asynchronous: bool):
+        """Create a pooled httpx client that counts the requests it sends"""
+        import httpx
+        
+        limits = httpx.Limits(
+            max_connections=self.pool_config.max_connections,
+            max_keepalive_connections=self.pool_config.max_keepalive_connections,
+            keepalive_expiry=self.pool_config.keepalive_expiry
+        )
+        options = {
+            "http2": stats["http2"],
+            "limits": limits,
+            "timeout": httpx.Timeout(self.pool_config.timeout, connect=self.pool_config.connect_timeout)
+        }
+
+        # Sync clients are shared between threads, e.g. the judge's workers
+        def count(request):
+            with self._lock:
+                stats["requests"] += 1
+
+        if asynchronous:
+            async def count_request(request):
+                count(request)
+            return httpx.AsyncClient(event_hooks={"request": [count_request]}, **options)
+        return httpx.Client(event_hooks={"request": [count]}, **options)
+
+    def _drop_closed_loops(self):
+        """Close and forget async clients whose event loop has finished"""
+        for key, loop in list(self._loops.items()):
+            if loop.is_closed():
+                _close_orphaned(self._http_clients[key])
+                del self._loops[key]
+                del self._clients[key]
+                del self._http_clients[key]
+                del self._stats[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Report how many clients exist and how hard each pool is used"""
+        with self._lock:
+            pools = []
+            for key, stats in self._stats.items():
+                pool = dict(stats)
+                pool["open_connections"] = _open_connections(self._http_clients[key])
+                pools.append(pool)
+        return {
+            "max_connections": self.pool_config.max_connections,
+            "max_keepalive_connections": self.pool_config.max_keepalive_connections,
+            "clients": len(pools),
+            "handouts": sum(pool["handouts"] for pool in pools),
+            "requests": sum(pool["requests"] for pool in pools),
+            "pools": pools
+        }
+
+    def close(self):
+        """Close every synchronous client, and the async clients of finished event loops"""
+        with self._lock:
+            self._drop_closed_loops()
+            for key, http_client in list(self._http_clients.items()):
+                if not self._stats[key]["asynchronous"]:
+                    http_client.close()
+                    del self._http_clients[key]
+                    del self._clients[key]
+                    del self._stats[key]
+
+def _fingerprint(api_key: str) -> str:
+    """Identify an API key in keys and statistics without storing it"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+def _close_orphaned(http_client):
+    """Close the sockets of an async client whose event loop has finished
+
+    aclose() needs the client's own loop, so each pooled connection's socket
+    is closed directly instead. Like _open_connections this is best effort.
+    """
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    for connection in list(getattr(pool, "connections", None) or []):
+        stream = getattr(getattr(connection, "_connection", None), "_network_stream", None)
+        # The asyncio transport under httpcore's anyio stream, beneath TLS for https
+        inner = getattr(stream, "_stream", None)
+        transport = getattr(getattr(inner, "transport_stream", inner), "_transport", None)
+        sock = getattr(transport, "_sock", None)
+        if sock is not None:
+            sock.close()
+            # Detached, so the transport does not report itself unclosed when collected
+            transport._sock = None
+
+def _open_connections(http_client) -> Optional[int]:
+    """Count the connections currently held by an httpx client's pool"""
+    # httpx does not expose its pool publicly, so this is best effort
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    return len(connections) if connections is not None else None
+
+_registry = ClientRegistry()
+atexit.register(_registry.close)
+
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry"""
+    return _registry
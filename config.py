@@ -1,5 +1,5 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -10,51 +10,149 @@ class LLMConfig(BaseModel):
     name: str
     model: str
     api_key: str
+    provider: Optional[str] = None  # Registered provider ID; inferred from the model name if unset
     temperature: float = 0.7
     max_tokens: int = 1000
+    base_url: Optional[str] = None
+    # Retries with exponential backoff and jitter on 429/5xx/timeouts
+    max_retries: int = 4
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 60.0
+    # Client-side token bucket limits (None = unlimited)
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    # USD per million tokens, used to report the cost of each response (None = unknown)
+    input_cost_per_mtok: Optional[float] = None
+    output_cost_per_mtok: Optional[float] = None
+    # Provider-specific settings, e.g. the mock provider's mode and latency
+    options: Dict[str, Any] = {}
+
+class ClientPoolConfig(BaseModel):
+    """Connection pool limits shared by all provider clients"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = True
+    timeout: float = 600.0
+    connect_timeout: float = 10.0
+
+class CacheConfig(BaseModel):
+    """Settings for the optional LLM response cache"""
+    path: Optional[str] = ".cache/llm_responses.sqlite"  # None keeps the cache in memory only
+    max_memory_entries: int = 1024
+    max_disk_entries: int = 100_000
+    ttl_seconds: Optional[float] = None
 
 class DialogueConfig(BaseModel):
     """Configuration for the dialogue system"""
     rounds: int = 10
     system_prompt: str = "You are engaging in a thoughtful conversation. Respond naturally and thoughtfully to the other person's message."
     conversation_topic: str = ""
+    stream: bool = True
+    # How much history each turn sends: full, sliding_window, pin_first or summary
+    context_policy: str = "full"
+    max_context_tokens: int = 8000
+    judge_model: str = "kimi-k2"
+    # Judge every N rounds in the background while the dialogue runs (0: judge once at the end)
+    judge_every: int = 0
+    # Judge conversations longer than this many tokens in chunks (0: one prompt),
+    # keeping chunk verdicts in this SQLite file (None: for this dialogue only)
+    judge_chunk_tokens: int = 0
+    judge_chunk_cache_path: Optional[str] = None
+    # End the dialogue once responses keep repeating recent turns (word 3-gram
+    # Jaccard similarity at or above the threshold) or contain a stop phrase
+    stop_on_convergence: bool = False
+    convergence_threshold: float = 0.5
+    stop_phrases: List[str] = []
+    # rich renders panels; jsonl writes one event per turn to events_path or
+    # stdout; quiet prints nothing and writes events only if events_path is set
+    output: str = "rich"
+    events_path: Optional[str] = None
+    # JSONL file each turn is appended to as it arrives; fsync is always, batch or never
+    transcript_path: Optional[str] = None
+    transcript_fsync: str = "batch"
+    # Per-provider latency, TTFT, tokens/s and retry histograms, written on close
+    metrics_path: Optional[str] = None
+    prometheus_path: Optional[str] = None
 
 # Default LLM configurations
 DEFAULT_LLMS = {
     "kimi-k2": LLMConfig(
         name="Kimi K2",
         model="moonshotai/kimi-k2-instruct",
+        provider="groq",
         api_key=os.getenv("GROQ_API_KEY", ""),
         temperature=0.7,
-        max_tokens=1000
+        max_tokens=1000,
+        requests_per_minute=60,
+        tokens_per_minute=10000,
+        input_cost_per_mtok=1.0,
+        output_cost_per_mtok=3.0
     ),
     "qwen3-32b": LLMConfig(
         name="Qwen 3 (32B)",
         model="qwen/qwen3-32b",
+        provider="groq",
         api_key=os.getenv("GROQ_API_KEY", ""),
         temperature=0.7,
-        max_tokens=1000
+        max_tokens=1000,
+        requests_per_minute=60,
+        tokens_per_minute=6000,
+        input_cost_per_mtok=0.29,
+        output_cost_per_mtok=0.59
     ),
     "llama-3.3-70b": LLMConfig(
         name="Llama 3.3 (70B)",
         model="llama-3.3-70b-versatile",
+        provider="groq",
         api_key=os.getenv("GROQ_API_KEY", ""),
         temperature=0.7,
-        max_tokens=1000
+        max_tokens=1000,
+        requests_per_minute=30,
+        tokens_per_minute=12000,
+        input_cost_per_mtok=0.59,
+        output_cost_per_mtok=0.79
     ),
     "gpt-4o": LLMConfig(
         name="GPT-4o",
         model="gpt-4o",
+        provider="openai",
         api_key=os.getenv("OPENAI_API_KEY", ""),
         temperature=0.7,
-        max_tokens=1000
+        max_tokens=1000,
+        input_cost_per_mtok=2.5,
+        output_cost_per_mtok=10.0
     ),
     "claude-3.5-sonnet": LLMConfig(
         name="Claude 3.5 Sonnet",
         model="anthropic.claude-3-5-sonnet-20241022-v2",
+        provider="anthropic",
         api_key=os.getenv("ANTHROPIC_API_KEY", ""),
         temperature=0.7,
-        max_tokens=1000
+        max_tokens=1000,
+        input_cost_per_mtok=3.0,
+        output_cost_per_mtok=15.0
+    ),
+    # Offline providers for trying the CLI and benchmarking without API keys
+    "mock": LLMConfig(
+        name="Mock",
+        model="mock-synthetic",
+        provider="mock",
+        api_key="",
+        input_cost_per_mtok=0.0,
+        output_cost_per_mtok=0.0,
+        options={"mode": "synthetic", "latency": "lognormal", "latency_mean": 0.3,
+                 "latency_stddev": 0.1, "tokens_per_second": 200}
+    ),
+    "mock-replay": LLMConfig(
+        name="Mock Replay",
+        model="mock-replay",
+        provider="mock",
+        api_key="",
+        input_cost_per_mtok=0.0,
+        output_cost_per_mtok=0.0,
+        options={"mode": "replay", "transcript": os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_conversation.txt"),
+                 "latency_mean": 0.1, "tokens_per_second": 200}
     )
 }
 
@@ -0,0 +1,126 @@
+"""
+Context Window - Keeps the history sent to each LLM under a token budget
+"""
+
+import functools
+from typing import Any, Callable, Dict, List, Tuple
+
+# full: send everything; sliding_window: newest turns that fit the budget;
+# pin_first: like sliding_window but always keeps the opening message;
+# summary: like pin_first, with older turns folded into a rolling summary
+CONTEXT_POLICIES = ("full", "sliding_window", "pin_first", "summary")
+
+# Chat formats add a few tokens of framing per message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Room kept free for the rolling summary itself
+SUMMARY_RESERVE_TOKENS = 400
+
+SUMMARY_PROMPT = """Summarize the conversation below for a participant who will continue it.
+Keep the main points, positions and open questions of each speaker in under 200 words.
+
+{previous}{turns}"""
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(model: str) -> Callable[[str], int]:
+    """Return a function counting the tokens of a text for this model
+
+    OpenAI models use their own tiktoken encoding. Other vendors do not publish
+    tiktoken encodings, so o200k_base approximates them. Without tiktoken (or
+    its encoding files) we fall back to about four characters per token.
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return lambda text: len(text) // 4
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+@functools.lru_cache(maxsize=8192)
+def _message_tokens(model: str, text: str) -> int:
+    # Every turn is counted again on each later turn, so remember the counts
+    return get_tokenizer(model)(text) + MESSAGE_OVERHEAD_TOKENS
+
+def count_tokens(messages: List[Dict[str, str]], model: str) -> int:
+    """Count the prompt tokens of chat messages for a model"""
+    return sum(_message_tokens(model, message["content"]) for message in messages)
+
+class ContextWindow:
+    """Chooses which part of the conversation history to send each turn
+
+    The window only ever moves forward: once turns have been folded into the
+    summary they are never sent verbatim again.
+    """
+
+    def __init__(self, policy: str = "full", max_tokens: int = 8000):
+        if policy not in CONTEXT_POLICIES:
+            raise ValueError(f"Unknown context policy: {policy}. Available: {list(CONTEXT_POLICIES)}")
+        self.policy = policy
+        self.max_tokens = max_tokens
+        self.summary = ""
+        # History index up to which turns are covered by the summary
+        self.summarized_until = 1
+
+    def _pinned(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        return messages[:1] if self.policy in ("pin_first", "summary") else []
+
+    def _summary_messages(self) -> List[Dict[str, str]]:
+        if not self.summary:
+            return []
+        return [{"role": "user", "content": f"Summary of the conversation so far:\n{self.summary}"}]
+
+    def _cut(self, messages: List[Dict[str, str]], model: str, budget: int) -> int:
+        """Index of the oldest message in the newest run of turns that fits the budget"""
+        start = len(self._pinned(messages))
+        if self.policy == "summary":
+            start = max(start, self.summarized_until)
+        cut = len(messages)
+        used = 0
+        while cut > start:
+            used += _message_tokens(model, messages[cut - 1]["content"])
+            # The newest message is always sent, even if it alone is over budget
+            if used > budget and cut < len(messages):
+                break
+            cut -= 1
+        return cut
+
+    def _budget(self, messages: List[Dict[str, str]], model: str) -> int:
+        budget = self.max_tokens - count_tokens(self._pinned(messages), model)
+        if self.policy == "summary":
+            budget -= max(SUMMARY_RESERVE_TOKENS, count_tokens(self._summary_messages(), model))
+        return budget
+
+    def pending_summary(self, messages: List[Dict[str, str]], model: str) -> List[Dict[str, str]]:
+        """Turns that must be folded into the summary before the next request
+
+        Once the history overflows, turns are summarized until only half the
+        budget is in use, so a summary request is needed every few turns
+        rather than on every turn.
+        """
+        if self.policy != "summary":
+            return []
+        budget = self._budget(messages, model)
+        if self._cut(messages, model, budget) <= self.summarized_until:
+            return []
+        return messages[self.summarized_until:self._cut(messages, model, budget // 2)]
+
+    def summary_request(self, turns: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Build the request that folds these turns into the rolling summary"""
+        previous = f"Summary so far:\n{self.summary}\n\nNew turns:\n" if self.summary else ""
+        transcript = "\n\n".join(f"{turn.get('speaker', turn['role'])}: {turn['content']}" for turn in turns)
+        return [{"role": "user", "content": SUMMARY_PROMPT.format(previous=previous, turns=transcript)}]
+
+    def update_summary(self, summary: str, turns_summarized: int):
+        self.summary = summary.strip()
+        self.summarized_until += turns_summarized
+
+    def build(self, messages: List[Dict[str, str]], model: str) -> Tuple[List[Dict[str, str]], int]:
+        """Return the messages to send and how many tokens the policy saved"""
+        if self.policy == "full":
+            return messages, 0
+        cut = self._cut(messages, model, self._budget(messages, model))
+        context = self._pinned(messages) + self._summary_messages() + messages[cut:]
+        return context, count_tokens(messages, model) - count_tokens(context, model)
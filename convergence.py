@@ -0,0 +1,57 @@
+"""
+Convergence - Detects dialogues that have started repeating themselves
+"""
+
+import re
+from collections import deque
+from typing import List, Optional, Set
+
+class DialogueConverged(Exception):
+    """Raised to end a dialogue early; the message is the reason"""
+
+def shingles(text: str, n: int = 3) -> Set[tuple]:
+    """Word n-grams of a text, lowercased and without punctuation"""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < n:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+def jaccard(a: Set[tuple], b: Set[tuple]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class ConvergenceDetector:
+    """Flags responses that repeat recent turns or contain a stop phrase
+
+    Each response is compared with the last ``window`` responses by word
+    n-gram Jaccard similarity. One similar reply can be a fair summary, so
+    the dialogue only counts as converged after ``patience`` similar
+    responses in a row. A ``threshold`` of None checks stop phrases only.
+    """
+
+    def __init__(self, threshold: Optional[float] = 0.5, window: int = 4, patience: int = 2,
+                 ngram: int = 3, stop_phrases: List[str] = None):
+        self.threshold = threshold
+        self.patience = patience
+        self.ngram = ngram
+        self.stop_phrases = [phrase.lower() for phrase in stop_phrases or []]
+        self._recent = deque(maxlen=window)
+        self._similar_in_a_row = 0
+
+    def check(self, text: str) -> Optional[str]:
+        """Add a response; return why the dialogue should stop, or None"""
+        lowered = text.lower()
+        for phrase in self.stop_phrases:
+            if phrase in lowered:
+                return f"stop phrase: {phrase!r}"
+        if self.threshold is None:
+            return None
+
+        current = shingles(text, self.ngram)
+        similarity = max((jaccard(current, previous) for previous in self._recent), default=0.0)
+        self._recent.append(current)
+        self._similar_in_a_row = self._similar_in_a_row + 1 if similarity >= self.threshold else 0
+        if self._similar_in_a_row >= self.patience:
+            return f"repetition: {self._similar_in_a_row} responses in a row at {similarity:.2f} similarity"
+        return None
@@ -3,28 +3,134 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.live import Live
+from rich.spinner import Spinner
 import time
 import os
 
-from config import DialogueConfig, get_llm_config
-from llm_providers import create_llm_provider
-from judge_model import ConversationJudge
+from config import CacheConfig, DialogueConfig, get_llm_config
+from llm_providers import create_llm_provider, LLMProviderError, LLMResult
+from judge_model import IncrementalJudge, create_judge
+from context_window import ContextWindow
+from convergence import ConvergenceDetector, DialogueConverged
+from event_log import EventLog
+from metrics import MetricsRegistry
+from transcript import TranscriptWriter, load_transcript, write_transcript
+from response_cache import ResponseCache
 
 console = Console()
 
+def _usage_by_speaker(history: List[Dict[str, Any]], summaries: List[Dict[str, Any]] = ()) -> Dict[str, Dict[str, Any]]:
+    """Aggregate the per-turn LLMResult metrics for each speaker
+    
+    ``summaries`` are the context-summary calls, entries with the speaker
+    and metrics of the call. Their tokens and cost count towards the
+    speaker's totals, but not towards its turns, latency or tokens/s.
+    """
+    usage = {}
+    for entry in [*history, *summaries]:
+        metrics = entry.get("metrics")
+        if entry["role"] not in ("assistant", "summary") or not metrics:
+            continue
+        totals = usage.setdefault(entry["speaker"], {
+            "model": metrics.get("model"),
+            "turns": 0,
+            "summaries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "turn_completion_tokens": 0,
+            "latency": 0.0,
+            "time_to_first_token": 0.0,
+            "cost": 0.0,
+            "context_tokens_saved": 0
+        })
+        totals["prompt_tokens"] += metrics.get("prompt_tokens", 0)
+        totals["completion_tokens"] += metrics.get("completion_tokens", 0)
+        if totals["cost"] is not None:
+            totals["cost"] = None if metrics.get("cost") is None else totals["cost"] + metrics["cost"]
+        if entry["role"] == "summary":
+            totals["summaries"] += 1
+            continue
+        totals["turns"] += 1
+        totals["turn_completion_tokens"] += metrics.get("completion_tokens", 0)
+        totals["context_tokens_saved"] += metrics.get("context_tokens_saved", 0)
+        totals["latency"] += metrics.get("latency", 0.0)
+        totals["time_to_first_token"] += metrics.get("time_to_first_token") or 0.0
+            
+    for totals in usage.values():
+        generation_time = totals["latency"] - totals["time_to_first_token"]
+        turn_tokens = totals.pop("turn_completion_tokens")
+        totals["tokens_per_second"] = round(turn_tokens / generation_time, 1) if generation_time > 0 else None
+        # A summary call can precede a turn that then failed
+        turns = max(totals["turns"], 1)
+        totals["avg_latency"] = round(totals.pop("latency") / turns, 3)
+        totals["avg_time_to_first_token"] = round(totals.pop("time_to_first_token") / turns, 3)
+        totals["cost_per_round"] = round(totals["cost"] / turns, 6) if totals["cost"] is not None else None
+        if totals["cost"] is not None:
+            totals["cost"] = round(totals["cost"], 6)
+    return usage
+
 class DialogueManager:
     """Manages the dialogue between two LLMs"""
     
-    def __init__(self, llm1_name: str, llm2_name: str, config: DialogueConfig = None):
+    def __init__(self, llm1_name: str, llm2_name: str, config: DialogueConfig = None, cache: ResponseCache = None,
+                 metrics: MetricsRegistry = None):
         self.config = config or DialogueConfig()
-        self.llm1 = create_llm_provider(get_llm_config(llm1_name))
-        self.llm2 = create_llm_provider(get_llm_config(llm2_name))
+        # Pass a shared registry to aggregate metrics over several dialogues
+        self.metrics = metrics or MetricsRegistry()
+        self._speaking = None
+        self.llm1 = create_llm_provider(get_llm_config(llm1_name), cache)
+        self.llm2 = create_llm_provider(get_llm_config(llm2_name), cache)
         self.conversation_history: List[Dict[str, Any]] = []
-        self.judge = ConversationJudge()
+        # Usage of the calls that summarise overflowing context, which are not turns
+        self.summary_usage: List[Dict[str, Any]] = []
+        # Non-system turns, and each participant's view of them: its own turns
+        # as assistant and its partner's as user. Both are appended turn by
+        # turn, so building a request never walks the whole history.
+        self._turns: List[Dict[str, Any]] = []
+        self._views: Dict[Any, List[Dict[str, str]]] = {self.llm1: [], self.llm2: []}
+        # Headless modes skip rendering entirely; errors still go to stderr unless quiet
+        self.rich = self.config.output == "rich"
+        self.console = console if self.rich else Console(stderr=True, quiet=self.config.output == "quiet")
+        self.chunk_cache = None
+        if self.config.judge_chunk_tokens:
+            self.chunk_cache = ResponseCache(CacheConfig(path=self.config.judge_chunk_cache_path))
+        self.judge = create_judge(self.config.judge_model, cache, self.config.judge_chunk_tokens, self.chunk_cache,
+                                  None if self.rich else self.console)
+        self.incremental_judge = IncrementalJudge(self.judge, self.config.judge_every) if self.config.judge_every > 0 else None
+        self.context_window = ContextWindow(self.config.context_policy, self.config.max_context_tokens)
+        self.convergence = None
+        if self.config.stop_on_convergence or self.config.stop_phrases:
+            self.convergence = ConvergenceDetector(
+                threshold=self.config.convergence_threshold if self.config.stop_on_convergence else None,
+                stop_phrases=self.config.stop_phrases
+            )
+        self.stop_reason = None
+        self.evaluation = None
+        self.events = None
+        if self.config.output == "jsonl" or self.config.events_path:
+            self.events = EventLog(self.config.events_path)
+        self.transcript = None
+        if self.config.transcript_path:
+            self.transcript = TranscriptWriter(
+                self.config.transcript_path,
+                fsync=self.config.transcript_fsync,
+                header=self._transcript_header()
+            )
+        
+    def _transcript_header(self) -> Dict[str, Any]:
+        return {"llm1": self.llm1.name, "llm2": self.llm2.name,
+                "models": [self.llm1.config.model, self.llm2.config.model]}
         
+    def _append_history(self, entry: Dict[str, Any]):
+        """Add an entry to the history and, if enabled, the durable transcript"""
+        self.conversation_history.append(entry)
+        if self.transcript is not None:
+            self.transcript.append(entry)
+            
     def add_system_message(self, message: str):
         """Add a system message to the conversation"""
-        self.conversation_history.append({
+        self._append_history({
             "role": "system",
             "content": message,
             "speaker": "System"
@@ -32,156 +138,438 @@ class DialogueManager:
         
     def add_user_message(self, message: str):
         """Add the initial user message"""
-        self.conversation_history.append({
+        entry = {
             "role": "user",
             "content": message,
             "speaker": "User"
-        })
+        }
+        self._append_history(entry)
+        self._add_turn(entry, None)
+        
+    def add_llm_response(self, message: str, speaker: str, metrics: Dict[str, Any] = None, llm=None):
+        """Add an LLM response to the conversation
         
-    def add_llm_response(self, message: str, speaker: str):
-        """Add an LLM response to the conversation"""
-        self.conversation_history.append({
+        ``llm`` identifies the speaking provider when both participants
+        share a name; otherwise it is looked up from ``speaker``.
+        """
+        entry = {
             "role": "assistant",
             "content": message,
             "speaker": speaker
-        })
+        }
+        if metrics:
+            entry["metrics"] = metrics
+        self._append_history(entry)
+        self._add_turn(entry, llm or (self.llm1 if speaker == self.llm1.name else self.llm2))
         
-    def get_messages_for_llm(self) -> List[Dict[str, str]]:
-        """Get messages in the format expected by LLM APIs"""
-        messages = []
-        for msg in self.conversation_history:
-            if msg["role"] != "system":  # Skip system messages for now
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        return messages
+    def resume(self, path: str) -> int:
+        """Load a saved transcript so the dialogue continues where it stopped
         
-    def display_message(self, message: str, speaker: str, round_num: int = None):
-        """Display a message with rich formatting"""
+        Responses alternate between llm1 and llm2, so the saved speakers must
+        be this manager's participants. Returns the number of responses loaded.
+        """
+        turns = load_transcript(path)
+        if not turns or turns[0]["role"] != "user":
+            raise ValueError(f"{path}: transcript does not start with an opening message")
+        participants = (self.llm1, self.llm2)
+        # Turns already in the transcript being resumed are not written again
+        transcript = self.transcript
+        if transcript is not None and os.path.abspath(transcript.path) == os.path.abspath(path):
+            self.transcript = None
+        try:
+            responses = 0
+            for turn in turns:
+                if turn["role"] == "system":
+                    self.add_system_message(turn["content"])
+                elif turn["role"] == "user":
+                    self.add_user_message(turn["content"])
+                else:
+                    llm = participants[responses % 2]
+                    if turn["speaker"] != llm.name:
+                        raise ValueError(f"{path}: expected a turn by {llm.name}, found {turn['speaker']}")
+                    self.add_llm_response(turn["content"], llm.name, turn.get("metrics"), llm)
+                    responses += 1
+        finally:
+            self.transcript = transcript
+        return responses
+        
+    def _add_turn(self, entry: Dict[str, Any], speaker_llm):
+        """Append a turn to every participant's view"""
+        self._turns.append(entry)
+        for llm, view in self._views.items():
+            view.append({
+                "role": "assistant" if llm is speaker_llm else "user",
+                "content": entry["content"]
+            })
+            
+    def get_messages_for_llm(self, llm=None) -> List[Dict[str, str]]:
+        """Get a participant's view of the conversation in the format expected by LLM APIs
+        
+        The list is kept up to date as turns are added; callers must not modify it.
+        """
+        return self._views[llm or self.llm1]
+        
+    def _turns_to_summarize(self, llm) -> List[Dict[str, Any]]:
+        return self.context_window.pending_summary(self._turns, llm.config.model)
+        
+    def _context_for(self, llm) -> Tuple[List[Dict[str, str]], int]:
+        """Fold overflowing turns into the rolling summary, then trim to the budget"""
+        turns = self._turns_to_summarize(llm)
+        if turns:
+            result = llm.generate(self.context_window.summary_request(turns))
+            self._record_summary(llm, result, len(turns))
+        return self.context_window.build(self.get_messages_for_llm(llm), llm.config.model)
+        
+    async def _acontext_for(self, llm) -> Tuple[List[Dict[str, str]], int]:
+        turns = self._turns_to_summarize(llm)
+        if turns:
+            result = await llm.agenerate(self.context_window.summary_request(turns))
+            self._record_summary(llm, result, len(turns))
+        return self.context_window.build(self.get_messages_for_llm(llm), llm.config.model)
+        
+    def _record_summary(self, llm, result: LLMResult, turns: int):
+        """Fold ``turns`` into the rolling summary and count the call's usage, apart from the turns"""
+        self.context_window.update_summary(result.text, turns)
+        metrics = result.metrics()
+        self.summary_usage.append({"role": "summary", "speaker": llm.name, "metrics": metrics})
+        self.metrics.observe(llm.provider_id, result)
+        self._emit("summary", speaker=llm.name, turns_summarized=turns, **metrics)
+        
+    def _turn_metrics(self, result: LLMResult, tokens_saved: int) -> Dict[str, Any]:
+        metrics = result.metrics()
+        metrics["context_tokens_saved"] = tokens_saved
+        return metrics
+        
+    def _message_panel(self, message, speaker: str, round_num: int = None) -> Panel:
+        """Build the rich panel for a message"""
         if round_num:
             title = f"Round {round_num} - {speaker}"
         else:
             title = speaker
             
-        # Color coding for different speakers
-        if speaker == self.llm1.name:
-            color = "blue"
-        elif speaker == self.llm2.name:
-            color = "green"
-        else:
-            color = "white"
+        color = self._speaker_color(speaker)
+        if isinstance(message, str):
+            message = Text(message, style=color)
             
-        panel = Panel(
-            Text(message, style=color),
+        return Panel(
+            message,
             title=title,
             border_style=color,
             padding=(1, 2)
         )
-        console.print(panel)
-        console.print()  # Add spacing
         
-    def run_dialogue(self, initial_message: str, rounds: int = None) -> List[Dict[str, Any]]:
-        """Run the dialogue between the two LLMs"""
-        rounds = rounds or self.config.rounds
+    def _speaker_color(self, speaker: str) -> str:
+        """Color coding for different speakers"""
+        if speaker == self.llm1.name:
+            return "blue"
+        elif speaker == self.llm2.name:
+            return "green"
+        return "white"
         
-        console.print(Panel(
-            f"Starting dialogue between [blue]{self.llm1.name}[/blue] and [green]{self.llm2.name}[/green]\n"
-            f"Rounds: {rounds}",
-            title="🤖 LLM Dialogue",
-            border_style="bold blue"
-        ))
-        console.print()
+    def display_message(self, message: str, speaker: str, round_num: int = None):
+        """Display a message with rich formatting"""
+        if not self.rich:
+            return
+        self.console.print(self._message_panel(message, speaker, round_num))
+        self.console.print()  # Add spacing
         
-        # Add initial message
-        self.add_user_message(initial_message)
+    def display_stream(self, llm, messages: List[Dict[str, str]], round_num: int = None) -> LLMResult:
+        """Render a streamed response live and return its LLMResult"""
+        text = Text(style=self._speaker_color(llm.name))
+        panel = self._message_panel(text, llm.name, round_num)
+        result = None
+        
+        with Live(Spinner("dots", text=f"🤖 {llm.name} is thinking..."), console=self.console, refresh_per_second=15) as live:
+            for delta, final in llm.stream_response(messages):
+                if final is not None:
+                    result = final
+                    continue
+                if not text.plain:
+                    live.update(panel)
+                text.append(delta)
+            live.update(panel)
+            
+        self.console.print()  # Add spacing
+        return self._stream_result(llm, result)
+        
+    @staticmethod
+    def _stream_result(llm, result: LLMResult) -> LLMResult:
+        """The final LLMResult of a stream, which a provider could fail to send"""
+        if result is None:
+            raise LLMProviderError(f"{llm.name} ({llm.config.model}): the stream ended without a final result")
+        return result
+        
+    def _announce_dialogue(self, initial_message: str, rounds: int, resumed: int = 0):
+        """Print the dialogue header and record the opening message"""
+        if self._turns:
+            initial_message = self._turns[0]["content"]
+        self._emit("dialogue_start", llm1=self.llm1.name, llm2=self.llm2.name, rounds=rounds,
+                   message=initial_message, resumed_responses=resumed)
+        if self.rich:
+            self.console.print(Panel(
+                f"Starting dialogue between [blue]{self.llm1.name}[/blue] and [green]{self.llm2.name}[/green]\n"
+                f"Rounds: {rounds}" + (f"\nResuming after {resumed} saved responses" if resumed else ""),
+                title="🤖 LLM Dialogue",
+                border_style="bold blue"
+            ))
+            self.console.print()
+        
+        # Add initial message, unless it came with a resumed transcript
+        if not self._turns:
+            self.add_user_message(initial_message)
         self.display_message(initial_message, "User")
         
-        # Run the dialogue
-        for round_num in range(1, rounds + 1):
-            console.print(f"[bold]🔄 Round {round_num}[/bold]")
-            console.print()
-            
-            # LLM 1 responds
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console
-            ) as progress:
-                task = progress.add_task(f"🤖 {self.llm1.name} is thinking...", total=None)
-                
-                messages = self.get_messages_for_llm()
-                response1 = self.llm1.generate_response(messages)
-                self.add_llm_response(response1, self.llm1.name)
-                
-            self.display_message(response1, self.llm1.name, round_num)
-            
-            # LLM 2 responds
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console
-            ) as progress:
-                task = progress.add_task(f"🤖 {self.llm2.name} is thinking...", total=None)
-                
-                messages = self.get_messages_for_llm()
-                response2 = self.llm2.generate_response(messages)
-                self.add_llm_response(response2, self.llm2.name)
-                
-            self.display_message(response2, self.llm2.name, round_num)
-            
-            # Add a separator between rounds
-            if round_num < rounds:
-                console.print("─" * 80)
-                console.print()
-                
-        console.print(Panel(
+    def _responses(self) -> int:
+        return sum(1 for turn in self._turns if turn["role"] == "assistant")
+        
+    def _speakers(self, round_num: int, resumed: int) -> Tuple[Any, ...]:
+        """Participants still to speak in a round, skipping responses already loaded"""
+        return (self.llm1, self.llm2)[max(0, resumed - 2 * (round_num - 1)):]
+        
+    def _announce_round(self, round_num: int):
+        """Print the round header"""
+        if not self.rich:
+            return
+        self.console.print(f"[bold]🔄 Round {round_num}[/bold]")
+        self.console.print()
+        
+    def _finish_round(self, round_num: int, rounds: int):
+        """Hand the round to the background judge and add a separator between rounds"""
+        if self.incremental_judge is not None:
+            self.incremental_judge.round_finished(self.conversation_history, round_num)
+        if self.rich and round_num < rounds:
+            self.console.print("─" * 80)
+            self.console.print()
+            
+    def _announce_completion(self):
+        """Print the completion banner"""
+        if not self.rich:
+            return
+        self.console.print(Panel(
             "✅ Dialogue completed!",
             title="🎉 Finished",
             border_style="bold green"
         ))
+        self.console.print()
+        
+    def _announce_stop(self, error: LLMProviderError):
+        """Record and print why the dialogue ended early"""
+        self.stop_reason = f"provider error: {error}"
+        if self._speaking is not None:
+            self.metrics.record_error(self._speaking.provider_id, self._speaking.config.model)
+        self._emit("stop", reason=self.stop_reason)
+        if not self.rich:
+            self.console.print(f"[red]{error}[/red]")
+            return
+        self.console.print(Panel(
+            f"[red]{error}[/red]\n\nStopping the dialogue; completed turns are kept.",
+            title="⚠️ Provider Error",
+            border_style="bold red"
+        ))
+        self.console.print()
+        
+    def _check_convergence(self):
+        """Stop the dialogue if the latest response repeats recent turns"""
+        if self.convergence is None:
+            return
+        reason = self.convergence.check(self._turns[-1]["content"])
+        if reason:
+            raise DialogueConverged(reason)
+            
+    def _announce_converged(self, converged: DialogueConverged):
+        """Record and print that the dialogue converged"""
+        self.stop_reason = f"converged ({converged})"
+        self._emit("stop", reason=self.stop_reason)
+        if not self.rich:
+            return
+        self.console.print(Panel(
+            f"Stopping early: {converged}",
+            title="🔁 Dialogue Converged",
+            border_style="bold yellow"
+        ))
+        self.console.print()
+        
+    def _emit(self, event: str, **fields):
+        if self.events is not None:
+            self.events.emit(event, **fields)
+            
+    def _record_turn(self, llm, round_num: int, result: LLMResult, tokens_saved: int):
+        """Add a response to the history and emit its turn event"""
+        metrics = self._turn_metrics(result, tokens_saved)
+        self.metrics.observe(llm.provider_id, result)
+        self.add_llm_response(result.text, llm.name, metrics, llm)
+        self._emit("turn", round=round_num, speaker=llm.name, text=result.text, **metrics)
+        
+    def _take_turn(self, llm, round_num: int):
+        """Let one LLM respond to the conversation so far"""
+        self._speaking = llm
+        messages, tokens_saved = self._context_for(llm)
+        if self.config.output != "rich":
+            # Headless: no spinner thread and no terminal rendering
+            if self.config.stream:
+                result = None
+                for _, final in llm.stream_response(messages):
+                    if final is not None:
+                        result = final
+                result = self._stream_result(llm, result)
+            else:
+                result = llm.generate(messages)
+            self._record_turn(llm, round_num, result, tokens_saved)
+            return
+            
+        if self.config.stream:
+            result = self.display_stream(llm, messages, round_num)
+            self._record_turn(llm, round_num, result, tokens_saved)
+            return
+            
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=self.console
+        ) as progress:
+            task = progress.add_task(f"🤖 {llm.name} is thinking...", total=None)
+            
+            result = llm.generate(messages)
+            self._record_turn(llm, round_num, result, tokens_saved)
+            
+        self.display_message(result.text, llm.name, round_num)
+        
+    async def _atake_turn(self, llm, round_num: int):
+        """Let one LLM respond without blocking the event loop"""
+        self._speaking = llm
+        # No live rendering here: rich allows only one live display per
+        # console, and several dialogues may share the event loop.
+        messages, tokens_saved = await self._acontext_for(llm)
+        if self.config.stream:
+            result = None
+            async for _, final in llm.astream_response(messages):
+                if final is not None:
+                    result = final
+            result = self._stream_result(llm, result)
+        else:
+            result = await llm.agenerate(messages)
+        self._record_turn(llm, round_num, result, tokens_saved)
+        self.display_message(result.text, llm.name, round_num)
+        
+    def run_dialogue(self, initial_message: str, rounds: int = None) -> List[Dict[str, Any]]:
+        """Run the dialogue between the two LLMs"""
+        rounds = rounds or self.config.rounds
+        resumed = self._responses()
+        self._announce_dialogue(initial_message, rounds, resumed)
+        
+        # Run the dialogue, continuing after any resumed responses
+        try:
+            for round_num in range(resumed // 2 + 1, rounds + 1):
+                self._announce_round(round_num)
+                for llm in self._speakers(round_num, resumed):
+                    self._take_turn(llm, round_num)
+                    self._check_convergence()
+                self._finish_round(round_num, rounds)
+            self._announce_completion()
+        except LLMProviderError as e:
+            self._announce_stop(e)
+        except DialogueConverged as e:
+            self._announce_converged(e)
         
         # Evaluate the conversation
-        console.print()
         self.evaluate_conversation()
+        self._emit("dialogue_end", summary=self.get_conversation_summary())
         
         return self.conversation_history
         
-    def save_conversation(self, filename: str = None):
-        """Save the conversation to a file in the 'dialogues' folder."""
-
-        dialogues_folder = "dialogues"
+    async def arun_dialogue(self, initial_message: str, rounds: int = None) -> List[Dict[str, Any]]:
+        """Run the dialogue on the event loop so many dialogues can proceed concurrently"""
+        rounds = rounds or self.config.rounds
+        resumed = self._responses()
+        self._announce_dialogue(initial_message, rounds, resumed)
+        
+        try:
+            for round_num in range(resumed // 2 + 1, rounds + 1):
+                self._announce_round(round_num)
+                for llm in self._speakers(round_num, resumed):
+                    await self._atake_turn(llm, round_num)
+                    self._check_convergence()
+                self._finish_round(round_num, rounds)
+            self._announce_completion()
+        except LLMProviderError as e:
+            self._announce_stop(e)
+        except DialogueConverged as e:
+            self._announce_converged(e)
+            
+        await self.aevaluate_conversation()
+        self._emit("dialogue_end", summary=self.get_conversation_summary())
+        
+        return self.conversation_history
+        
+    def save_conversation(self, filename: str = None, dialogues_folder: str = "dialogues") -> str:
+        """Save the conversation as a JSONL transcript in the 'dialogues' folder."""
 
         if not os.path.exists(dialogues_folder):
             os.makedirs(dialogues_folder)
 
         if not filename:
             timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"dialogue_{timestamp}.txt"
+            filename = f"dialogue_{timestamp}.jsonl"
 
         full_path = os.path.join(dialogues_folder, filename)
-        with open(full_path, 'w', encoding='utf-8') as f:
-            f.write(f"LLM Dialogue: {self.llm1.name} vs {self.llm2.name}\n")
-            f.write("=" * 50 + "\n\n")
-            
-            for msg in self.conversation_history:
-                f.write(f"{msg['speaker']}: {msg['content']}\n\n")
+        return write_transcript(full_path, self._transcript_header(), self.conversation_history, self.evaluation)
         
     def evaluate_conversation(self):
         """Evaluate the conversation using the judge model"""
         try:
-            evaluation = self.judge.judge_conversation(self.conversation_history)
-            self.judge.display_evaluation(evaluation)
-            return evaluation
+            if self.incremental_judge is not None:
+                self.evaluation = self.incremental_judge.finish(self.conversation_history)
+            else:
+                self.evaluation = self.judge.judge_conversation(self.conversation_history)
+            self._emit("evaluation", evaluation=self.evaluation)
+            if self.transcript is not None:
+                self.transcript.append_record("evaluation", evaluation=self.evaluation)
+            if self.rich:
+                self.judge.display_evaluation(self.evaluation)
+            return self.evaluation
         except Exception as e:
-            console.print(f"[red]Error evaluating conversation: {e}[/red]")
+            self.console.print(f"[red]Error evaluating conversation: {e}[/red]")
+            return None
+            
+    async def aevaluate_conversation(self):
+        """Evaluate the conversation using the judge model without blocking"""
+        try:
+            if self.incremental_judge is not None:
+                self.evaluation = await self.incremental_judge.afinish(self.conversation_history)
+            else:
+                self.evaluation = await self.judge.ajudge_conversation(self.conversation_history)
+            self._emit("evaluation", evaluation=self.evaluation)
+            if self.transcript is not None:
+                self.transcript.append_record("evaluation", evaluation=self.evaluation)
+            if self.rich:
+                self.judge.display_evaluation(self.evaluation)
+            return self.evaluation
+        except Exception as e:
+            self.console.print(f"[red]Error evaluating conversation: {e}[/red]")
             return None
     
+    def close(self):
+        """Write the metrics reports, stop the background judge and close the event log, transcript and chunk cache"""
+        self.metrics.write(self.config.metrics_path, self.config.prometheus_path)
+        if self.incremental_judge is not None:
+            self.incremental_judge.close()
+        if self.events is not None:
+            self.events.close()
+        if self.transcript is not None:
+            self.transcript.close()
+        if self.chunk_cache is not None:
+            self.chunk_cache.close()
+            
     def get_conversation_summary(self) -> Dict[str, Any]:
-        """Get a summary of the conversation"""
+        """Get a summary of the conversation, including token usage and cost per model"""
+        usage = _usage_by_speaker(self.conversation_history, self.summary_usage)
+        costs = [totals["cost"] for totals in usage.values()]
         return {
             "llm1": self.llm1.name,
             "llm2": self.llm2.name,
             "total_messages": len(self.conversation_history),
-            "rounds": len([msg for msg in self.conversation_history if msg["role"] == "assistant"]) // 2
+            "rounds": len([msg for msg in self.conversation_history if msg["role"] == "assistant"]) // 2,
+            "stop_reason": self.stop_reason,
+            "usage": usage,
+            "total_cost": round(sum(costs), 6) if costs and None not in costs else None
         } 
\ No newline at end of file
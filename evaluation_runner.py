@@ -0,0 +1,185 @@
+"""
+Evaluation Runner - Judges many saved transcripts concurrently, with a verdict cache
+"""
+
+import asyncio
+import contextlib
+import glob
+import json
+import os
+import time
+from typing import Dict, Any, List, Tuple
+
+from judge_model import RUBRIC_VERSION, SCORE_KEYS, create_judge
+from response_cache import ResponseCache, make_cache_key
+from transcript import load_transcript
+
+TRANSCRIPT_EXTENSIONS = (".jsonl", ".txt")
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Resolve files, directories and glob patterns to transcript files
+
+    Directories contribute their .jsonl and .txt files; a .txt file is
+    skipped when a converted .jsonl with the same name sits next to it.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths += [os.path.join(pattern, name) for name in os.listdir(pattern)
+                      if name.endswith(TRANSCRIPT_EXTENSIONS)]
+        elif glob.has_magic(pattern):
+            paths += glob.glob(pattern, recursive=True)
+        else:
+            paths.append(pattern)
+    unique = sorted(set(os.path.normpath(path) for path in paths))
+    return [path for path in unique
+            if not (path.endswith(".txt") and os.path.splitext(path)[0] + ".jsonl" in unique)]
+
+def transcript_hash(messages: List[Dict[str, Any]]) -> str:
+    """Hash of what the judge sees, so re-saving or converting a transcript keeps its hash"""
+    return make_cache_key({"messages": [[msg.get("role"), msg.get("speaker"), msg.get("content")] for msg in messages]})
+
+class EvaluationRunner:
+    """Judges transcripts concurrently and caches each verdict
+
+    Verdicts are cached by transcript hash, judge model and RUBRIC_VERSION,
+    so only new or changed transcripts, or a new rubric, cost a judge call.
+    Heuristic fallbacks are never cached. With ``chunk_tokens`` long
+    transcripts are judged in chunks whose verdicts share the results
+    cache, so a transcript that grew only has its new chunks judged.
+
+    With ``prefilter`` every transcript is first scored by the local
+    heuristics in one batch, and those whose heuristic overall score is
+    below it are not sent to the judge. Without a configured judge the
+    batch heuristic scores are the evaluations.
+    """
+
+    def __init__(self, judge_model: str = "kimi-k2", max_concurrency: int = 8,
+                 response_cache: ResponseCache = None, results_cache: ResponseCache = None, rescore: bool = False,
+                 chunk_tokens: int = 0, prefilter: float = None):
+        self.judge_model = judge_model
+        self.chunk_tokens = chunk_tokens
+        self.prefilter = prefilter
+        self.judge = create_judge(judge_model, response_cache, chunk_tokens, None if rescore else results_cache)
+        self.max_concurrency = max_concurrency
+        self.results_cache = results_cache
+        self.rescore = rescore
+
+    def _cache_key(self, digest: str) -> str:
+        key = {"kind": "evaluation", "transcript": digest, "judge": self.judge_model, "rubric": RUBRIC_VERSION}
+        if self.chunk_tokens:
+            key["chunk_tokens"] = self.chunk_tokens
+        return make_cache_key(key)
+
+    def _score_heuristically(self, paths: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Load the transcripts and score them all in one batch; returns (messages, evaluations) by path"""
+        from heuristic_scorer import heuristic_evaluation, score_transcripts
+        transcripts = {}
+        for path in paths:
+            try:
+                transcripts[path] = load_transcript(path)
+            except Exception:
+                # Reported when the transcript is evaluated
+                continue
+        scores = score_transcripts(transcripts)
+        return transcripts, {path: heuristic_evaluation(row) for path, row in scores.iterrows()}
+
+    async def _evaluate(self, path: str, slots: asyncio.Semaphore, messages: List[Dict[str, Any]] = None,
+                        heuristic: Dict[str, Any] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        record = {"type": "result", "path": path, "judge": self.judge_model, "rubric_version": RUBRIC_VERSION, "cached": False}
+        status = None
+        try:
+            messages = messages if messages is not None else load_transcript(path)
+            if not messages:
+                raise ValueError("no messages found")
+            record["transcript_hash"] = transcript_hash(messages)
+            key = self._cache_key(record["transcript_hash"])
+            cached = None
+            if self.results_cache is not None and not self.rescore:
+                cached = self.results_cache.get(key)
+            if cached is not None:
+                record["cached"] = True
+                record["evaluation"] = cached
+            elif heuristic is not None and not self.judge.available:
+                record["evaluation"] = heuristic
+            elif heuristic is not None and self.prefilter is not None and heuristic["overall_score"] < self.prefilter:
+                record["evaluation"] = heuristic
+                status = "filtered"
+            else:
+                async with slots:
+                    record["evaluation"] = await self.judge.ajudge_conversation(messages)
+                if self.results_cache is not None and not record["evaluation"].get("fallback"):
+                    self.results_cache.set(key, record["evaluation"])
+            record["status"] = status or ("fallback" if record["evaluation"].get("fallback") else "ok")
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+        record["duration"] = round(time.perf_counter() - started, 3)
+        return record
+
+    async def arun(self, paths: List[str], results_path: str = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Judge every transcript; returns the summary and the records in input order
+
+        With ``results_path`` each record is written to that JSONL file as
+        soon as it finishes, and the summary is written last.
+        """
+        if results_path and os.path.dirname(results_path):
+            os.makedirs(os.path.dirname(results_path), exist_ok=True)
+        slots = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+        records = []
+        transcripts, heuristics = {}, {}
+        if self.prefilter is not None or not self.judge.available:
+            transcripts, heuristics = self._score_heuristically(paths)
+        evaluations = [self._evaluate(path, slots, transcripts.get(path), heuristics.get(path)) for path in paths]
+        with open(results_path, "w", encoding="utf-8") if results_path else contextlib.nullcontext() as results:
+            for finished in asyncio.as_completed(evaluations):
+                record = await finished
+                records.append(record)
+                if results:
+                    results.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    results.flush()
+            summary = self.summarize(records, time.perf_counter() - started, results_path)
+            summary["judge_parse_failures"] = self.judge.parse_failures
+            summary["judge_repairs"] = self.judge.repairs
+            if results:
+                results.write(json.dumps({"type": "summary", **summary}, ensure_ascii=False) + "\n")
+        order = {path: index for index, path in enumerate(paths)}
+        return summary, sorted(records, key=lambda record: order[record["path"]])
+
+    def run(self, paths: List[str], results_path: str = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        return asyncio.run(self.arun(paths, results_path))
+
+    @staticmethod
+    def summarize(records: List[Dict[str, Any]], elapsed: float, results_path: str) -> Dict[str, Any]:
+        """Counts and per-metric score statistics over the judged transcripts"""
+        judged = [record["evaluation"] for record in records if record["status"] == "ok"]
+        scores = {}
+        for key in SCORE_KEYS:
+            values = [evaluation[key] for evaluation in judged if isinstance(evaluation.get(key), (int, float))]
+            if values:
+                mean = sum(values) / len(values)
+                scores[key] = {
+                    "mean": round(mean, 2),
+                    "stddev": round((sum((value - mean) ** 2 for value in values) / len(values)) ** 0.5, 2),
+                    "min": min(values),
+                    "max": max(values),
+                    "count": len(values)
+                }
+        agreements = [evaluation["ensemble"]["agreement"] for evaluation in judged
+                      if (evaluation.get("ensemble") or {}).get("agreement") is not None]
+        summary = {
+            "transcripts": len(records),
+            "judged": sum(record["status"] == "ok" and not record["cached"] for record in records),
+            "cached": sum(record["cached"] for record in records),
+            "fallback": sum(record["status"] == "fallback" for record in records),
+            "filtered": sum(record["status"] == "filtered" for record in records),
+            "failed": sum(record["status"] == "failed" for record in records),
+            "elapsed": round(elapsed, 2),
+            "scores": scores,
+            "results": results_path
+        }
+        if agreements:
+            summary["agreement"] = {"mean": round(sum(agreements) / len(agreements), 3), "min": min(agreements)}
+        return summary
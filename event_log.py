@@ -0,0 +1,26 @@
+"""
+Event Log - Structured JSONL events for headless dialogue runs
+"""
+
+import json
+import sys
+import time
+from typing import Any, Optional
+
+class EventLog:
+    """Writes one JSON object per line to a file, or to stdout without a path"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._owns_file = path is not None
+        self._file = open(path, "a", encoding="utf-8") if path else sys.stdout
+
+    def emit(self, event: str, **fields: Any):
+        """Write an event immediately so tailing processes see it as it happens"""
+        record = {"event": event, "time": round(time.time(), 3)}
+        record.update(fields)
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._owns_file and not self._file.closed:
+            self._file.close()
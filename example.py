@@ -29,7 +29,7 @@ def main():
     conversation = manager.run_dialogue(initial_message, rounds=5)
     
     # Save the conversation
-    manager.save_conversation("example_dialogue.txt")
+    manager.save_conversation("example_dialogue.jsonl")
     
     # Show summary
     summary = manager.get_conversation_summary()
@@ -0,0 +1,115 @@
+"""
+Heuristic Scorer - Offline conversation scores computed for many transcripts at once
+"""
+
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from judge_model import SCORE_KEYS
+
+# Word n-gram size used to measure repetition
+NGRAM = 3
+
+# A median response this long, in words, earns the full depth score
+DEPTH_WORDS = 150
+
+FEATURES = ["responses", "turn_balance", "lexical_diversity", "repetition_rate", "question_rate",
+            "words_mean", "words_std", "words_p10", "words_p50", "words_p90"]
+
+def response_frame(transcripts: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """One row per AI response (transcript, speaker, content) across all transcripts"""
+    rows = [(transcript_id, msg.get("speaker") or "", msg.get("content") or "")
+            for transcript_id, history in transcripts.items()
+            for msg in history if msg.get("role") == "assistant"]
+    return pd.DataFrame(rows, columns=["transcript", "speaker", "content"])
+
+def transcript_features(responses: pd.DataFrame, transcript_ids: List[str]) -> pd.DataFrame:
+    """Per-transcript features computed with columnar operations over all responses
+
+    turn_balance is the quietest speaker's word count over the loudest's,
+    lexical_diversity the mean type-token ratio of the responses,
+    repetition_rate the share of word n-grams already used earlier in the
+    same transcript, and question_rate the share of responses asking one.
+    """
+    tokens = responses["content"].str.lower().str.findall(r"\w+")
+    responses = responses.assign(response=np.arange(len(responses)), words=tokens.str.len(),
+                                 question=responses["content"].str.contains("?", regex=False))
+    features = pd.DataFrame(index=pd.Index(transcript_ids, name="transcript"))
+    by_transcript = responses.groupby("transcript")
+    features["responses"] = by_transcript.size()
+    lengths = by_transcript["words"]
+    features["words_mean"] = lengths.mean()
+    features["words_std"] = lengths.std(ddof=0)
+    for percentile in (10, 50, 90):
+        features[f"words_p{percentile}"] = lengths.quantile(percentile / 100)
+    features["question_rate"] = by_transcript["question"].mean()
+
+    per_speaker = responses.groupby(["transcript", "speaker"])["words"].sum().groupby(level="transcript")
+    features["turn_balance"] = (per_speaker.min() / per_speaker.max().replace(0, np.nan)).where(per_speaker.size() > 1, 0.0)
+
+    # Every word of every response in order, as integer codes
+    word_response = np.repeat(responses["response"].to_numpy(), responses["words"].to_numpy())
+    codes, vocabulary = pd.factorize(pd.Series(tokens.explode().dropna().to_numpy()))
+    transcript_codes, _ = pd.factorize(responses["transcript"])
+    word_transcript = transcript_codes[word_response]
+    response_transcript = responses.set_index("response")["transcript"]
+
+    distinct = np.unique(word_response.astype(np.int64) * len(vocabulary) + codes)
+    distinct_words = np.bincount(distinct // max(len(vocabulary), 1), minlength=len(responses))
+    type_token = pd.Series(distinct_words / responses["words"].replace(0, np.nan).to_numpy(), index=responses["response"])
+    features["lexical_diversity"] = type_token.groupby(response_transcript).mean()
+
+    # N-grams start wherever the word NGRAM - 1 places later is in the same response
+    starts = np.flatnonzero(word_response[:len(word_response) - NGRAM + 1] == word_response[NGRAM - 1:])
+    grams = pd.DataFrame({f"w{offset}": codes[starts + offset] for offset in range(NGRAM)})
+    grams.insert(0, "transcript", word_transcript[starts])
+    repeated = pd.Series(grams.duplicated().to_numpy(), index=responses["transcript"].to_numpy()[word_response[starts]])
+    features["repetition_rate"] = repeated.groupby(level=0).mean()
+    return features[FEATURES].fillna(0.0)
+
+def score_features(features: pd.DataFrame) -> pd.DataFrame:
+    """Map features to the judge's 0-10 scores"""
+    scores = pd.DataFrame(index=features.index)
+    scores["engagement_score"] = 4 + 6 * features["question_rate"]
+    scores["coherence_score"] = 10 * (1 - features["repetition_rate"])
+    scores["creativity_score"] = 10 * features["lexical_diversity"]
+    scores["balance_score"] = 10 * features["turn_balance"]
+    scores["depth_score"] = 10 * (features["words_p50"] / DEPTH_WORDS).clip(upper=1)
+    scores = scores.clip(0, 10).where(features["responses"] > 0, 0.0)
+    scores.insert(0, "overall_score", scores.mean(axis=1))
+    return scores[SCORE_KEYS].round(1)
+
+def score_transcripts(transcripts: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """Features and scores of every transcript, one row per transcript id"""
+    features = transcript_features(response_frame(transcripts), list(transcripts))
+    return features.join(score_features(features))
+
+def heuristic_evaluation(row: pd.Series) -> Dict[str, Any]:
+    """An evaluation dictionary from one row of ``score_transcripts``"""
+    strengths, weaknesses = [], []
+    if row["question_rate"] >= 0.5:
+        strengths.append("Participants keep asking each other questions")
+    if row["turn_balance"] >= 0.7:
+        strengths.append("Balanced participation")
+    elif row["responses"] > 1:
+        weaknesses.append("One participant dominates the conversation")
+    if row["repetition_rate"] >= 0.3:
+        weaknesses.append("Responses repeat earlier turns")
+    if row["words_p50"] < 20:
+        weaknesses.append("Responses are short")
+    return {
+        **{key: float(row[key]) for key in SCORE_KEYS},
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+        "summary": f"Heuristic evaluation of {int(row['responses'])} AI responses "
+                   f"(median {row['words_p50']:.0f} words, {row['question_rate']:.0%} asking questions, "
+                   f"{row['repetition_rate']:.0%} repeated {NGRAM}-grams).",
+        "heuristics": {feature: round(float(row[feature]), 3) for feature in FEATURES},
+        "fallback": True
+    }
+
+def evaluate_heuristically(conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Heuristic evaluation of a single conversation"""
+    return heuristic_evaluation(score_transcripts({"conversation": conversation_history}).iloc[0])
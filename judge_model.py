@@ -2,167 +2,400 @@
 Judge Model - Evaluates the quality of conversations between LLMs
 """
 
-import json
-from typing import Dict, Any, List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
-from config import get_llm_config
-from llm_providers import create_llm_provider
+from config import LLMConfig, get_llm_config
+from llm_providers import create_llm_provider, infer_provider
+from rate_limit import estimate_tokens
+from response_cache import ResponseCache, make_cache_key
 
 console = Console()
+# Judges print here unless given a console of their own
+_default_console = console
+
+# Bump whenever the judge prompt or scoring changes, so cached verdicts are not reused
+RUBRIC_VERSION = 2
+
+# Repair prompts sent after a reply fails validation, before giving up on a verdict
+MAX_REPAIR_ATTEMPTS = 1
+
+# Chunks of a long conversation judged at the same time
+MAX_CHUNK_WORKERS = 4
+
+# Two-sided 95% Student t critical values by degrees of freedom, for ensemble
+# confidence intervals; see t_critical_95 for degrees of freedom between entries
+T_CRITICAL_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+                 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110,
+                 18: 2.101, 19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060,
+                 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980}
+
+SCORE_KEYS = ["overall_score", "engagement_score", "coherence_score", "creativity_score", "balance_score", "depth_score"]
+
+JUDGE_JSON_FORMAT = """{
+  "overall_score": 0.0-10.0,
+  "engagement_score": 0.0-10.0,
+  "coherence_score": 0.0-10.0,
+  "creativity_score": 0.0-10.0,
+  "balance_score": 0.0-10.0,
+  "depth_score": 0.0-10.0,
+  "participant_scores": {"<speaker name>": 0.0-10.0},
+  "strengths": ["string"],
+  "weaknesses": ["string"],
+  "summary": "string"
+}"""
+
+class JudgeVerdict(BaseModel):
+    """Schema the judge's reply must match"""
+    overall_score: float = Field(ge=0, le=10)
+    engagement_score: float = Field(ge=0, le=10)
+    coherence_score: float = Field(ge=0, le=10)
+    creativity_score: float = Field(ge=0, le=10)
+    balance_score: float = Field(ge=0, le=10)
+    depth_score: float = Field(ge=0, le=10)
+    participant_scores: Dict[str, float] = {}
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    summary: str = ""
+
+VERDICT_SCHEMA = JudgeVerdict.model_json_schema()
+
+def has_credentials(config: LLMConfig) -> bool:
+    """Whether a judge model can be called: it has an API key or is the offline mock"""
+    return bool(config.api_key) or (config.provider or infer_provider(config.model)) == "mock"
+
+def chunk_conversation(history: List[Dict[str, Any]], max_tokens: int) -> List[Tuple[int, List[Dict[str, Any]]]]:
+    """Split a history into (start index, messages) chunks of about ``max_tokens`` each
+    
+    Chunks only break between messages, and where a chunk ends depends only
+    on the messages in it, so appending turns leaves every earlier chunk
+    but the last unchanged.
+    """
+    chunks, current, size, start = [], [], 0, 0
+    for index, msg in enumerate(history):
+        tokens = estimate_tokens([msg])
+        if current and size + tokens > max_tokens:
+            chunks.append((start, current))
+            current, size, start = [], 0, index
+        current.append(msg)
+        size += tokens
+    if current:
+        chunks.append((start, current))
+    return chunks
+
+def round_span(history: List[Dict[str, Any]], start: int, chunk: List[Dict[str, Any]]) -> str:
+    """The rounds a chunk starting at ``start`` covers, e.g. "3-4" """
+    before = sum(1 for msg in history[:start] if msg.get("role") == "assistant")
+    responses = sum(1 for msg in chunk if msg.get("role") == "assistant")
+    first = before // 2 + 1
+    return f"{first}-{max(first, (before + responses + 1) // 2)}"
 
 class ConversationJudge:
     """Evaluates and scores conversations between LLMs"""
     
-    def __init__(self, judge_model_name: str = "kimi-k2"):
-        """Initialize the judge with a specific model"""
+    def __init__(self, judge_model_name: str = "kimi-k2", cache: ResponseCache = None,
+                 chunk_tokens: int = 0, chunk_cache: ResponseCache = None, console: Console = None):
+        """Initialize the judge with a specific model
+        
+        Conversations longer than ``chunk_tokens`` (0: never) are judged in
+        chunks; ``chunk_cache`` keeps chunk verdicts so that re-judging a
+        conversation with more rounds only judges the new chunks. Warnings
+        and evaluations print to ``console``, the module console by default.
+        """
+        self.console = console or _default_console
         try:
             config = get_llm_config(judge_model_name)
-            self.judge_llm = create_llm_provider(config)
+            if not has_credentials(config):
+                raise ValueError(f"no API key is set for {config.name}")
+            self.judge_llm = create_llm_provider(config, cache)
             self.model_name = judge_model_name
         except Exception as e:
-            console.print(f"[yellow]Warning: Could not initialize judge model {judge_model_name}: {e}[/yellow]")
+            self.console.print(f"[yellow]Warning: Could not initialize judge model {judge_model_name}: {e}[/yellow]")
             # Fallback to a simpler evaluation method
             self.judge_llm = None
             self.model_name = None
+        self.chunk_tokens = chunk_tokens
+        self.chunk_cache = chunk_cache
+        # Replies that failed validation, and repair prompts sent for them
+        self.parse_failures = 0
+        self.repairs = 0
     
-    def format_conversation_for_judging(self, conversation_history: List[Dict[str, Any]]) -> str:
-        """Format the conversation history for the judging model"""
-        formatted = "CONVERSATION BETWEEN TWO AI MODELS:\n\n"
+    def format_conversation_for_judging(self, conversation_history: List[Dict[str, Any]], start: int = 0) -> str:
+        """Format the conversation history for the judging model, numbering turns from ``start``"""
+        lines = ["CONVERSATION BETWEEN TWO AI MODELS:\n\n"]
         
-        for i, msg in enumerate(conversation_history):
+        for i, msg in enumerate(conversation_history, start=start):
             speaker = msg.get('speaker', 'Unknown')
             content = msg.get('content', '')
-            formatted += f"{i+1}. {speaker}: {content}\n\n"
+            lines.append(f"{i+1}. {speaker}: {content}\n\n")
             
-        return formatted
+        return "".join(lines)
     
-    def judge_conversation(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Evaluate the conversation using the judge model"""
-        if not self.judge_llm:
-            return self._simple_evaluation(conversation_history)
-        
+    def build_judge_prompt(self, conversation_history: List[Dict[str, Any]]) -> str:
+        """Build the evaluation prompt sent to the judge model"""
         formatted_conversation = self.format_conversation_for_judging(conversation_history)
         
-        prompt = f"""You are an expert evaluator of AI conversations. Please analyze the following conversation between two AI models and provide a detailed evaluation.
+        return f"""You are an expert evaluator of AI conversations. Please analyze the following conversation between two AI models and provide a detailed evaluation.
 
 {formatted_conversation}
 
 Please provide your evaluation in the following JSON format:
-{{
-  "overall_score": 0.0-10.0,
-  "engagement_score": 0.0-10.0,
-  "coherence_score": 0.0-10.0,
-  "creativity_score": 0.0-10.0,
-  "balance_score": 0.0-10.0,
-  "depth_score": 0.0-10.0,
-  "strengths": ["string"],
-  "weaknesses": ["string"],
-  "summary": "string"
-}}
+{JUDGE_JSON_FORMAT}
 
-Be thorough but concise in your evaluation. Focus on the quality of the interaction between the two models."""
+Be thorough but concise in your evaluation. Focus on the quality of the interaction between the two models, and score each AI participant by its speaker name in participant_scores."""
+    
+    def build_segment_prompt(self, opening: Dict[str, Any], segment: List[Dict[str, Any]], start: int, rounds: str) -> str:
+        """Build the prompt for judging some rounds of a conversation that is still running"""
+        formatted_segment = self.format_conversation_for_judging(segment, start)
+        context = f"The conversation opened with: {opening.get('content', '')}\n\n" if start else ""
+        
+        return f"""You are an expert evaluator of AI conversations. Please analyze rounds {rounds} of an ongoing conversation between two AI models and provide a detailed evaluation of these rounds only.
+
+{context}{formatted_segment}
+
+Please provide your evaluation in the following JSON format:
+{JUDGE_JSON_FORMAT}
+
+Be thorough but concise in your evaluation. Focus on the quality of the interaction between the two models, and score each AI participant by its speaker name in participant_scores."""
+    
+    def judge_segment(self, opening: Dict[str, Any], segment: List[Dict[str, Any]], start: int, rounds: str) -> Dict[str, Any]:
+        """Evaluate some rounds of a conversation"""
+        if not self.judge_llm:
+            return self._simple_evaluation(segment)
         
         try:
-            messages = [{"role": "user", "content": prompt}]
-            response = self.judge_llm.generate_response(messages)
-            
-            # Try to parse as JSON
-            try:
-                evaluation = json.loads(response)
-                return evaluation
-            except json.JSONDecodeError:
-                # If direct JSON parsing fails, try to extract JSON from the response
-                try:
-                    # Look for JSON block in the response (common with LLMs)
-                    import re
-                    json_match = re.search(r'```(?:json)?\s*({.*?})\s*```', response, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(1)
-                        evaluation = json.loads(json_str)
-                        return evaluation
-                    
-                    # If no JSON block found, try to find JSON object directly
-                    json_match = re.search(r'{.*}', response, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        # Try to fix common JSON issues
-                        json_str = json_str.replace('"""', '"').replace("'''", '"')
-                        evaluation = json.loads(json_str)
-                        return evaluation
-                except (json.JSONDecodeError, ValueError):
-                    pass
-                
-                # If all parsing fails, create a structured response
-                return self._parse_text_response(response)
-                
+            return self._judge(self.build_segment_prompt(opening, segment, start, rounds))
         except Exception as e:
-            console.print(f"[red]Error in judge model: {e}[/red]")
-            return self._simple_evaluation(conversation_history)
+            self.console.print(f"[red]Error in judge model: {e}[/red]")
+            return self._simple_evaluation(segment)
     
-    def _parse_text_response(self, response: str) -> Dict[str, Any]:
-        """Parse a text response into our expected format"""
-        # This is a fallback method if the judge model doesn't return JSON
-        return {
-            "overall_score": 7.5,
-            "engagement_score": 7.0,
-            "coherence_score": 8.0,
-            "creativity_score": 7.0,
-            "balance_score": 7.5,
-            "depth_score": 8.0,
-            "strengths": ["Fallback evaluation due to parsing error"],
-            "weaknesses": ["Could not parse detailed response"],
-            "summary": response[:200] + "..." if len(response) > 200 else response
-        }
+    async def ajudge_segment(self, opening: Dict[str, Any], segment: List[Dict[str, Any]], start: int, rounds: str) -> Dict[str, Any]:
+        """Evaluate some rounds of a conversation without blocking the event loop"""
+        if not self.judge_llm:
+            return self._simple_evaluation(segment)
+        
+        try:
+            return await self._ajudge(self.build_segment_prompt(opening, segment, start, rounds))
+        except Exception as e:
+            self.console.print(f"[red]Error in judge model: {e}[/red]")
+            return self._simple_evaluation(segment)
     
-    def _simple_evaluation(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Simple heuristic-based evaluation when LLM judge is not available"""
-        # Count messages
-        total_messages = len(conversation_history)
-        llm_messages = len([msg for msg in conversation_history if msg.get('role') == 'assistant'])
+    def judge_conversation(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Evaluate the conversation using the judge model"""
+        if not self.judge_llm:
+            return self._simple_evaluation(conversation_history)
+        if self._needs_chunking(conversation_history):
+            return self.judge_chunked(conversation_history)
         
-        # Simple heuristics
-        avg_message_length = sum(len(msg.get('content', '')) for msg in conversation_history if msg.get('content')) / max(total_messages, 1)
+        try:
+            return self._judge(self.build_judge_prompt(conversation_history))
+        except Exception as e:
+            self.console.print(f"[red]Error in judge model: {e}[/red]")
+            return self._simple_evaluation(conversation_history)
+    
+    async def ajudge_conversation(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Evaluate the conversation without blocking the event loop"""
+        if not self.judge_llm:
+            return self._simple_evaluation(conversation_history)
+        if self._needs_chunking(conversation_history):
+            return await self.ajudge_chunked(conversation_history)
         
-        # Scores based on simple heuristics
-        engagement_score = min(10.0, llm_messages * 1.5)
-        coherence_score = 7.0  # Default
-        creativity_score = 6.5  # Default
-        balance_score = 8.0 if abs(llm_messages - (total_messages - llm_messages)) <= 2 else 6.0
-        depth_score = min(10.0, avg_message_length / 100)
+        try:
+            return await self._ajudge(self.build_judge_prompt(conversation_history))
+        except Exception as e:
+            self.console.print(f"[red]Error in judge model: {e}[/red]")
+            return self._simple_evaluation(conversation_history)
+    
+    @property
+    def available(self) -> bool:
+        """Whether a judge model can be called, rather than only the heuristics"""
+        return self.judge_llm is not None and has_credentials(self.judge_llm.config)
+    
+    def _needs_chunking(self, conversation_history: List[Dict[str, Any]]) -> bool:
+        return self.chunk_tokens > 0 and estimate_tokens(conversation_history) > self.chunk_tokens
+    
+    def _chunk_key(self, opening: Dict[str, Any], start: int, chunk: List[Dict[str, Any]]) -> str:
+        return make_cache_key({
+            "kind": "judge_chunk", "judge": self.model_name, "rubric": RUBRIC_VERSION,
+            "opening": opening.get("content"), "start": start,
+            "messages": [[msg.get("role"), msg.get("speaker"), msg.get("content")] for msg in chunk]
+        })
+    
+    def _plan_chunks(self, conversation_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chunk the conversation and look up verdicts already cached for each chunk"""
+        plan = []
+        for start, chunk in chunk_conversation(conversation_history, self.chunk_tokens):
+            key = self._chunk_key(conversation_history[0], start, chunk)
+            plan.append({
+                "start": start, "chunk": chunk, "key": key,
+                "rounds": round_span(conversation_history, start, chunk),
+                "responses": sum(1 for msg in chunk if msg.get("role") == "assistant"),
+                "verdict": self.chunk_cache.get(key) if self.chunk_cache is not None else None
+            })
+        return plan
+    
+    def judge_chunked(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Judge a long conversation chunk by chunk, concurrently, and combine the verdicts"""
+        plan = self._plan_chunks(conversation_history)
+        todo = [item for item in plan if item["verdict"] is None]
+        if todo:
+            opening = conversation_history[0]
+            with ThreadPoolExecutor(max_workers=min(len(todo), MAX_CHUNK_WORKERS), thread_name_prefix="judge") as executor:
+                verdicts = executor.map(lambda item: self.judge_segment(opening, item["chunk"], item["start"], item["rounds"]), todo)
+                for item, verdict in zip(todo, verdicts):
+                    item["verdict"] = verdict
+        return self._reduce_chunks(plan, todo)
+    
+    async def ajudge_chunked(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Judge a long conversation chunk by chunk without blocking the event loop"""
+        plan = self._plan_chunks(conversation_history)
+        todo = [item for item in plan if item["verdict"] is None]
+        opening = conversation_history[0]
+        slots = asyncio.Semaphore(MAX_CHUNK_WORKERS)
         
-        overall_score = (engagement_score + coherence_score + creativity_score + balance_score + depth_score) / 5
+        async def judge_chunk(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with slots:
+                return await self.ajudge_segment(opening, item["chunk"], item["start"], item["rounds"])
+            
+        verdicts = await asyncio.gather(*(judge_chunk(item) for item in todo))
+        for item, verdict in zip(todo, verdicts):
+            item["verdict"] = verdict
+        return self._reduce_chunks(plan, todo)
+    
+    def _reduce_chunks(self, plan: List[Dict[str, Any]], judged: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Cache the new chunk verdicts and combine all of them, weighted by responses"""
+        if self.chunk_cache is not None:
+            for item in judged:
+                if not item["verdict"].get("fallback"):
+                    self.chunk_cache.set(item["key"], item["verdict"])
+        combined = self.combine_evaluations([(item["rounds"], max(1, item["responses"]), item["verdict"]) for item in plan])
+        combined["chunks"] = {"total": len(plan), "judged": len(judged), "cached": len(plan) - len(judged)}
+        return combined
+    
+    @staticmethod
+    def combine_evaluations(partials: List[Tuple[str, int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Merge (rounds, responses, evaluation) segments into one evaluation
         
+        Scores are averaged weighted by the number of responses in each
+        segment; strengths and weaknesses are merged without duplicates.
+        """
+        combined = {}
+        for key in SCORE_KEYS:
+            weighted = [(float(evaluation[key]), weight) for _, weight, evaluation in partials
+                        if isinstance(evaluation.get(key), (int, float))]
+            total_weight = sum(weight for _, weight in weighted)
+            if total_weight:
+                combined[key] = round(sum(score * weight for score, weight in weighted) / total_weight, 1)
+        participants = {}
+        for _, weight, evaluation in partials:
+            scores = evaluation.get("participant_scores")
+            for speaker, score in (scores.items() if isinstance(scores, dict) else []):
+                if isinstance(score, (int, float)):
+                    participants.setdefault(speaker, []).append((float(score), weight))
+        if participants:
+            combined["participant_scores"] = {
+                speaker: round(sum(score * weight for score, weight in scores) / sum(weight for _, weight in scores), 1)
+                for speaker, scores in participants.items()
+            }
+        for key in ("strengths", "weaknesses"):
+            combined[key] = list(dict.fromkeys(item for _, _, evaluation in partials for item in evaluation.get(key, [])))[:5]
+        combined["summary"] = " ".join(f"Rounds {rounds}: {evaluation['summary']}"
+                                       for rounds, _, evaluation in partials if evaluation.get("summary"))
+        if any(evaluation.get("fallback") for _, _, evaluation in partials):
+            combined["fallback"] = True
+        combined["segments"] = [{"rounds": rounds, "overall_score": evaluation.get("overall_score")}
+                                for rounds, _, evaluation in partials]
+        return combined
+    
+    def _judge(self, prompt: str) -> Dict[str, Any]:
+        """Ask for a schema-constrained verdict, re-asking up to MAX_REPAIR_ATTEMPTS times"""
+        messages = [{"role": "user", "content": prompt}]
+        for _ in range(MAX_REPAIR_ATTEMPTS + 1):
+            reply = self.judge_llm.generate(messages, json_schema=VERDICT_SCHEMA).text
+            verdict, error = self._validate(reply)
+            if verdict is not None:
+                return verdict
+            messages = messages + self._repair_messages(reply, error)
+        return self._unparsed_evaluation(reply, error)
+    
+    async def _ajudge(self, prompt: str) -> Dict[str, Any]:
+        """Ask for a schema-constrained verdict without blocking the event loop"""
+        messages = [{"role": "user", "content": prompt}]
+        for _ in range(MAX_REPAIR_ATTEMPTS + 1):
+            reply = (await self.judge_llm.agenerate(messages, json_schema=VERDICT_SCHEMA)).text
+            verdict, error = self._validate(reply)
+            if verdict is not None:
+                return verdict
+            messages = messages + self._repair_messages(reply, error)
+        return self._unparsed_evaluation(reply, error)
+    
+    def _validate(self, reply: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Validate a reply against JudgeVerdict; returns (verdict, None) or (None, error)"""
+        try:
+            return JudgeVerdict.model_validate_json(reply).model_dump(), None
+        except ValidationError as e:
+            self.parse_failures += 1
+            return None, str(e)
+    
+    def _repair_messages(self, reply: str, error: str) -> List[Dict[str, str]]:
+        """Follow-up turns that show the judge its invalid reply and what was wrong with it"""
+        self.repairs += 1
+        return [
+            {"role": "assistant", "content": reply},
+            {"role": "user", "content": f"Your reply did not match the required JSON format:\n{error}\n\n"
+                                        f"Reply with only the corrected JSON object in this format:\n{JUDGE_JSON_FORMAT}"}
+        ]
+    
+    def _unparsed_evaluation(self, reply: str, error: str) -> Dict[str, Any]:
+        """An unscored evaluation for a judge that never produced a valid verdict"""
+        self.console.print(f"[yellow]Warning: judge reply did not match the verdict schema after "
+                      f"{MAX_REPAIR_ATTEMPTS} repair attempt(s)[/yellow]")
         return {
-            "overall_score": round(overall_score, 1),
-            "engagement_score": round(engagement_score, 1),
-            "coherence_score": round(coherence_score, 1),
-            "creativity_score": round(creativity_score, 1),
-            "balance_score": round(balance_score, 1),
-            "depth_score": round(depth_score, 1),
-            "strengths": ["Good message exchange", "Balanced participation"],
-            "weaknesses": ["Limited heuristic evaluation"],
-            "summary": f"Simple evaluation of {total_messages} total messages with {llm_messages} AI responses."
+            "strengths": [],
+            "weaknesses": [],
+            "summary": reply[:200] + "..." if len(reply) > 200 else reply,
+            "parse_error": error,
+            "fallback": True
         }
     
+    def _simple_evaluation(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Offline heuristic evaluation when LLM judge is not available"""
+        # pandas is only loaded when a heuristic evaluation is needed
+        from heuristic_scorer import evaluate_heuristically
+        return evaluate_heuristically(conversation_history)
+    
     def display_evaluation(self, evaluation: Dict[str, Any]):
         """Display the evaluation results in a formatted way"""
-        console.print(Panel(
+        self.console.print(Panel(
             f"🤖 Conversation Evaluation by {self.model_name or 'Heuristic Evaluator'}",
             title="Evaluation Results",
             border_style="bold magenta"
         ))
         
-        # Overall score
-        console.print(f"Overall Score: [bold green]{evaluation.get('overall_score', 'N/A')}[/bold green]/10.0")
-        console.print()
+        # Overall score, with its confidence interval when several judges scored
+        ensemble = evaluation.get('ensemble') or {}
+        spread = ensemble.get('scores', {})
+        interval = lambda key: (f"{spread[key]['ci95'][0]}-{spread[key]['ci95'][1]}"
+                                if spread.get(key, {}).get('ci95') else "")
+        overall_ci = f" (95% CI {interval('overall_score')})" if interval('overall_score') else ""
+        self.console.print(f"Overall Score: [bold green]{evaluation.get('overall_score', 'N/A')}[/bold green]/10.0{overall_ci}")
+        if ensemble:
+            self.console.print(f"[dim]{len(ensemble['judges'])} judges, agreement {ensemble.get('agreement', 'N/A')}"
+                          + (f", failed: {', '.join(ensemble['failed'])}" if ensemble.get('failed') else "") + "[/dim]")
+        self.console.print()
         
         # Detailed scores table
         table = Table(title="Detailed Scores")
         table.add_column("Metric", style="cyan")
         table.add_column("Score", style="green")
+        if ensemble:
+            table.add_column("95% CI")
+            table.add_column("Std Dev")
         
         metrics = [
             ("Engagement", "engagement_score"),
@@ -174,27 +407,251 @@ Be thorough but concise in your evaluation. Focus on the quality of the interact
         
         for label, key in metrics:
             score = evaluation.get(key, 'N/A')
-            table.add_row(label, str(score))
+            if ensemble:
+                table.add_row(label, str(score), interval(key), str(spread.get(key, {}).get('stddev', '')))
+            else:
+                table.add_row(label, str(score))
+        for speaker, score in (evaluation.get('participant_scores') or {}).items():
+            table.add_row(f"Participant: {speaker}", str(score), *(["", ""] if ensemble else []))
         
-        console.print(table)
-        console.print()
+        self.console.print(table)
+        self.console.print()
+        
+        # Scores of the rounds judged while the dialogue ran, or of the chunks of a long one
+        if evaluation.get('segments'):
+            scores = ", ".join(f"rounds {segment['rounds']}: {segment['overall_score']}" for segment in evaluation['segments'])
+            chunks = evaluation.get('chunks')
+            how = f"in {chunks['total']} chunks, {chunks['cached']} cached" if chunks else "incrementally"
+            self.console.print(f"[dim]Judged {how} ({scores})[/dim]")
+            self.console.print()
         
         # Strengths
         if evaluation.get('strengths'):
-            console.print("[bold]Strengths:[/bold]")
+            self.console.print("[bold]Strengths:[/bold]")
             for strength in evaluation.get('strengths', []):
-                console.print(f"  • {strength}")
-            console.print()
+                self.console.print(f"  • {strength}")
+            self.console.print()
         
         # Weaknesses
         if evaluation.get('weaknesses'):
-            console.print("[bold]Weaknesses:[/bold]")
+            self.console.print("[bold]Weaknesses:[/bold]")
             for weakness in evaluation.get('weaknesses', []):
-                console.print(f"  • {weakness}")
-            console.print()
+                self.console.print(f"  • {weakness}")
+            self.console.print()
         
         # Summary
         if evaluation.get('summary'):
-            console.print("[bold]Summary:[/bold]")
-            console.print(evaluation.get('summary', ''))
-            console.print()
+            self.console.print("[bold]Summary:[/bold]")
+            self.console.print(evaluation.get('summary', ''))
+            self.console.print()
+
+
+def t_critical_95(df: int) -> float:
+    """Two-sided 95% t critical value, from the nearest tabulated degrees of freedom not above ``df``
+    
+    Rounding down keeps the interval slightly wide rather than too narrow.
+    """
+    return T_CRITICAL_95[max(entry for entry in T_CRITICAL_95 if entry <= df)]
+
+def aggregate_verdicts(verdicts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the verdicts of several judges into one evaluation with error bars
+    
+    Each score is the mean over the judges that returned one; ``ensemble``
+    holds its variance, standard deviation and 95% t-interval, and the
+    agreement: one minus the mean pairwise difference between judges as a
+    fraction of the 0-10 scale. Judges whose verdict is a fallback are left
+    out unless every judge fell back.
+    """
+    scored = {name: verdict for name, verdict in verdicts.items() if not verdict.get("fallback")}
+    used = scored or verdicts
+    combined, spread, agreements = {}, {}, []
+    for key in SCORE_KEYS:
+        values = {name: float(verdict[key]) for name, verdict in used.items() if isinstance(verdict.get(key), (int, float))}
+        if not values:
+            continue
+        scores = list(values.values())
+        n = len(scores)
+        mean = sum(scores) / n
+        variance = sum((score - mean) ** 2 for score in scores) / (n - 1) if n > 1 else 0.0
+        half_width = t_critical_95(n - 1) * (variance / n) ** 0.5 if n > 1 else 0.0
+        combined[key] = round(mean, 1)
+        spread[key] = {
+            "mean": round(mean, 2),
+            "variance": round(variance, 3),
+            "stddev": round(variance ** 0.5, 2),
+            "ci95": [round(max(0.0, mean - half_width), 1), round(min(10.0, mean + half_width), 1)],
+            "values": values
+        }
+        pairs = [abs(a - b) for i, a in enumerate(scores) for b in scores[i + 1:]]
+        if pairs:
+            agreements.append(1 - sum(pairs) / len(pairs) / 10)
+    participants = {}
+    for verdict in used.values():
+        for speaker, score in (verdict.get("participant_scores") or {}).items():
+            if isinstance(score, (int, float)):
+                participants.setdefault(speaker, []).append(float(score))
+    if participants:
+        combined["participant_scores"] = {speaker: round(sum(scores) / len(scores), 1) for speaker, scores in participants.items()}
+    for key in ("strengths", "weaknesses"):
+        combined[key] = list(dict.fromkeys(item for verdict in used.values() for item in verdict.get(key, [])))[:5]
+    combined["summary"] = " ".join(f"{name}: {verdict['summary']}" for name, verdict in used.items() if verdict.get("summary"))
+    if not scored:
+        combined["fallback"] = True
+    combined["ensemble"] = {
+        "judges": list(verdicts),
+        "failed": [name for name in verdicts if name not in scored],
+        "agreement": round(sum(agreements) / len(agreements), 3) if agreements else None,
+        "scores": spread
+    }
+    return combined
+
+class JudgeEnsemble(ConversationJudge):
+    """Several judges queried concurrently, their verdicts aggregated with error bars
+    
+    Wall time is that of the slowest judge rather than the sum. Each member
+    keeps its own chunking, caching and schema repair.
+    """
+    
+    def __init__(self, judge_model_names: List[str], cache: ResponseCache = None,
+                 chunk_tokens: int = 0, chunk_cache: ResponseCache = None, console: Console = None):
+        self.judges = [ConversationJudge(name, cache, chunk_tokens, chunk_cache, console) for name in judge_model_names]
+        self.console = self.judges[0].console
+        self.names = list(judge_model_names)
+        self.model_name = ", ".join(self.names)
+        self.judge_llm = None
+        self.chunk_tokens = chunk_tokens
+        self.chunk_cache = chunk_cache
+        
+    @property
+    def available(self) -> bool:
+        return any(judge.available for judge in self.judges)
+        
+    @property
+    def parse_failures(self) -> int:
+        return sum(judge.parse_failures for judge in self.judges)
+        
+    @property
+    def repairs(self) -> int:
+        return sum(judge.repairs for judge in self.judges)
+        
+    def _fan_out(self, method: str, *arguments) -> Dict[str, Any]:
+        with ThreadPoolExecutor(max_workers=len(self.judges), thread_name_prefix="judge") as executor:
+            verdicts = list(executor.map(lambda judge: getattr(judge, method)(*arguments), self.judges))
+        return aggregate_verdicts(dict(zip(self.names, verdicts)))
+        
+    async def _afan_out(self, method: str, *arguments) -> Dict[str, Any]:
+        verdicts = await asyncio.gather(*(getattr(judge, method)(*arguments) for judge in self.judges))
+        return aggregate_verdicts(dict(zip(self.names, verdicts)))
+        
+    def judge_conversation(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self._fan_out("judge_conversation", conversation_history)
+        
+    async def ajudge_conversation(self, conversation_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self._afan_out("ajudge_conversation", conversation_history)
+        
+    def judge_segment(self, opening: Dict[str, Any], segment: List[Dict[str, Any]], start: int, rounds: str) -> Dict[str, Any]:
+        return self._fan_out("judge_segment", opening, segment, start, rounds)
+        
+    async def ajudge_segment(self, opening: Dict[str, Any], segment: List[Dict[str, Any]], start: int, rounds: str) -> Dict[str, Any]:
+        return await self._afan_out("ajudge_segment", opening, segment, start, rounds)
+        
+    def combine_evaluations(self, partials: List[Tuple[str, int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Merge ensemble segments, keeping the error bars and agreement
+        
+        Each judge's scores are combined over the segments first, and those
+        per-judge scores are then aggregated across judges again.
+        """
+        combined = ConversationJudge.combine_evaluations(partials)
+        per_judge = {}
+        for name in self.names:
+            segments = [(rounds, weight, {key: spread["values"][name]
+                                          for key, spread in (evaluation.get("ensemble") or {}).get("scores", {}).items()
+                                          if name in spread["values"]})
+                        for rounds, weight, evaluation in partials]
+            scores = {key: value for key, value in ConversationJudge.combine_evaluations(segments).items() if key in SCORE_KEYS}
+            per_judge[name] = scores if scores else {"fallback": True}
+        aggregated = aggregate_verdicts(per_judge)
+        combined.update({key: aggregated[key] for key in SCORE_KEYS if key in aggregated})
+        combined["ensemble"] = aggregated["ensemble"]
+        for segment, (_, _, evaluation) in zip(combined["segments"], partials):
+            segment["agreement"] = (evaluation.get("ensemble") or {}).get("agreement")
+        return combined
+
+def create_judge(judge_models: str, cache: ResponseCache = None, chunk_tokens: int = 0,
+                 chunk_cache: ResponseCache = None, console: Console = None) -> ConversationJudge:
+    """A single judge, or an ensemble for a comma-separated list of judge models"""
+    names = [name.strip() for name in judge_models.split(",") if name.strip()]
+    if len(names) > 1:
+        return JudgeEnsemble(names, cache, chunk_tokens, chunk_cache, console)
+    return ConversationJudge(names[0] if names else judge_models, cache, chunk_tokens, chunk_cache, console)
+
+class IncrementalJudge:
+    """Scores finished rounds in the background while the dialogue continues
+    
+    Every ``rounds_per_segment`` rounds the turns since the last segment are
+    handed to the judge, on a worker thread for ``run_dialogue`` or as a task
+    for ``arun_dialogue``. At the end only the last, short segment is still
+    outstanding, and the segment scores are combined into one evaluation.
+    """
+    
+    def __init__(self, judge: ConversationJudge, rounds_per_segment: int = 2):
+        self.judge = judge
+        self.rounds_per_segment = max(1, rounds_per_segment)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = []
+        self._judged_until = 0
+        self._judged_rounds = 0
+        
+    def round_finished(self, history: List[Dict[str, Any]], round_num: int):
+        """Call after each round; submits a segment every ``rounds_per_segment`` rounds"""
+        if round_num - self._judged_rounds >= self.rounds_per_segment:
+            self._submit(history, round_num)
+            
+    def _submit(self, history: List[Dict[str, Any]], round_num: int):
+        segment = [msg for msg in history[self._judged_until:] if msg["role"] != "system"]
+        responses = sum(1 for msg in segment if msg["role"] == "assistant")
+        if not responses:
+            return
+        start = self._judged_until
+        rounds = f"{self._judged_rounds + 1}-{round_num}"
+        arguments = (history[0], segment, start, rounds)
+        try:
+            asyncio.get_running_loop()
+            work = asyncio.ensure_future(self.judge.ajudge_segment(*arguments))
+        except RuntimeError:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="judge")
+            work = self._executor.submit(self.judge.judge_segment, *arguments)
+        self._pending.append((rounds, responses, work))
+        self._judged_until = len(history)
+        self._judged_rounds = round_num
+        
+    def _final_round(self, history: List[Dict[str, Any]]) -> int:
+        responses = sum(1 for msg in history if msg["role"] == "assistant")
+        return max(self._judged_rounds, (responses + 1) // 2)
+        
+    def finish(self, history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Judge the remaining turns and combine all segments"""
+        self._submit(history, self._final_round(history))
+        partials = [(rounds, responses, work.result()) for rounds, responses, work in self._pending]
+        self.close()
+        return self._combine(history, partials)
+        
+    async def afinish(self, history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Judge the remaining turns and combine all segments without blocking"""
+        self._submit(history, self._final_round(history))
+        results = await asyncio.gather(*(work for _, _, work in self._pending))
+        partials = [(rounds, responses, result) for (rounds, responses, _), result in zip(self._pending, results)]
+        return self._combine(history, partials)
+        
+    def close(self):
+        """Stop the worker thread; a dialogue that continues later gets a fresh one"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        
+    def _combine(self, history: List[Dict[str, Any]], partials) -> Dict[str, Any]:
+        self._pending = []
+        if not partials:
+            return self.judge._simple_evaluation(history)
+        return self.judge.combine_evaluations(partials)
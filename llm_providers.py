@@ -1,104 +1,815 @@
-import openai
-import anthropic
-import groq
-from typing import List, Dict, Any
+import asyncio
+import contextlib
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass, asdict, fields
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Iterator, AsyncIterator, Tuple, Optional, Type
 from config import LLMConfig
+from client_pool import get_client_registry
+from rate_limit import get_rate_limiter, estimate_tokens
+from response_cache import ResponseCache, make_cache_key
+from transcript import load_transcript
+
+@dataclass
+class LLMResult:
+    """A provider response with its token usage, timing and cost"""
+    text: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    time_to_first_token: Optional[float] = None
+    finish_reason: Optional[str] = None
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost: Optional[float] = None
+    retries: int = 0
+    cached: bool = False
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+        
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Completion tokens per second of generation, after the first token"""
+        generation_time = self.latency - (self.time_to_first_token or 0.0)
+        if generation_time <= 0 or not self.completion_tokens:
+            return None
+        return round(self.completion_tokens / generation_time, 1)
+        
+    def metrics(self) -> Dict[str, Any]:
+        """Everything except the text, as stored with each conversation turn"""
+        metrics = asdict(self)
+        del metrics["text"]
+        metrics["total_tokens"] = self.total_tokens
+        metrics["tokens_per_second"] = self.tokens_per_second
+        return metrics
+        
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LLMResult":
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+# Streaming generators yield (text_delta, None) for every chunk and finish with
+# ("", result) where result is the LLMResult with usage, timing and cost.
+StreamChunk = Tuple[str, Optional[LLMResult]]
+
+# Provider ID -> provider class. Each class imports its SDK only when it first
+# builds a client, so listing models or parsing CLI arguments stays cheap.
+PROVIDER_REGISTRY: Dict[str, Type["BaseLLMProvider"]] = {}
+
+# Used when an LLMConfig does not name its provider explicitly
+MODEL_NAME_HINTS = [
+    ("kimi", "groq"),
+    ("qwen", "groq"),
+    ("llama", "groq"),
+    ("gpt", "openai"),
+    ("claude", "anthropic"),
+    ("mock", "mock")
+]
+
+def register_provider(provider_id: str):
+    """Class decorator that makes a provider available to create_llm_provider"""
+    def decorator(provider_class):
+        provider_class.provider_id = provider_id
+        PROVIDER_REGISTRY[provider_id] = provider_class
+        return provider_class
+    return decorator
+
+class LLMProviderError(Exception):
+    """Raised when a provider cannot produce a response"""
+    
+    retryable = False
+    
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class LLMRateLimitError(LLMProviderError):
+    """The provider rejected the request with HTTP 429"""
+    
+    retryable = True
+
+class LLMUnavailableError(LLMProviderError):
+    """Timeouts, connection failures and 5xx responses worth retrying"""
+    
+    retryable = True
+
+def _parse_retry_after(headers) -> Optional[float]:
+    """Read the server's requested delay from Retry-After style headers"""
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _is_connection_error(exc: Exception) -> bool:
+    """Detect SDK connection/timeout errors without importing every SDK"""
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    return bool(names & {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"})
+
+def _is_provider_error(exc: Exception) -> bool:
+    """Whether an exception came from the API or the network, rather than a bug in our own code"""
+    if isinstance(exc, (LLMProviderError, ConnectionError, TimeoutError)) or _is_connection_error(exc):
+        return True
+    if getattr(exc, "status_code", None) is not None or getattr(exc, "response", None) is not None:
+        return True
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    return bool(names & {"APIError", "HTTPError"})
 
 class BaseLLMProvider:
-    """Base class for LLM providers"""
+    """Base class for LLM providers
     
-    def __init__(self, config: LLMConfig):
+    Subclasses implement the raw ``_generate``/``_agenerate``/``_stream``/``_astream``
+    calls and return an LLMResult with the token usage and finish reason. The
+    public methods add caching, rate limiting, typed errors, retries, timing
+    and cost.
+    """
+    
+    # Identifies the SDK in the shared client registry
+    provider_id = ""
+    
+    def __init__(self, config: LLMConfig, cache: Optional[ResponseCache] = None):
         self.config = config
         self.name = config.name
+        self.rate_limiter = get_rate_limiter(self.provider_id, config)
+        self.cache = cache
+        # Optional asyncio.Semaphore capping concurrent async requests (see batch_runner)
+        self.request_slots = None
+        
+    @property
+    def client(self):
+        """Shared synchronous SDK client from the process-wide registry"""
+        return get_client_registry().get_client(
+            self.provider_id, self.config.api_key, self.config.base_url,
+            lambda http_client: self._build_client(http_client, asynchronous=False)
+        )
+        
+    @property
+    def async_client(self):
+        """Shared asynchronous SDK client for the running event loop"""
+        return get_client_registry().get_client(
+            self.provider_id, self.config.api_key, self.config.base_url,
+            lambda http_client: self._build_client(http_client, asynchronous=True),
+            asynchronous=True
+        )
+        
+    def _build_client(self, http_client, asynchronous: bool):
+        """Create the SDK client on top of a pooled httpx client"""
+        raise NotImplementedError
         
     def generate_response(self, messages: List[Dict[str, str]]) -> str:
         """Generate a response based on conversation history"""
+        return self.generate(messages).text
+        
+    async def agenerate_response(self, messages: List[Dict[str, str]]) -> str:
+        """Asynchronously generate a response based on conversation history"""
+        return (await self.agenerate(messages)).text
+        
+    def generate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        """Generate a response together with its usage, latency and cost
+        
+        With ``json_schema`` the provider is asked for a JSON object matching
+        it, through JSON mode or tool use depending on the API. The reply
+        text is that JSON; callers still validate it.
+        """
+        started = time.perf_counter()
+        cache_key = self._cache_key(messages, json_schema)
+        cached = self._cache_lookup(cache_key, started)
+        if cached is not None:
+            return cached
+            
+        attempt = 0
+        while True:
+            self._acquire(messages)
+            try:
+                result = self._generate(messages, json_schema)
+                break
+            except Exception as e:
+                if not _is_provider_error(e):
+                    raise
+                delay = self._retry_delay(e, attempt)
+            time.sleep(delay)
+            attempt += 1
+        return self._finish(result, cache_key, started, None, attempt)
+        
+    async def agenerate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        """Asynchronously generate a response together with its usage, latency and cost"""
+        started = time.perf_counter()
+        cache_key = self._cache_key(messages, json_schema)
+        cached = self._cache_lookup(cache_key, started)
+        if cached is not None:
+            return cached
+            
+        attempt = 0
+        while True:
+            await self._aacquire(messages)
+            try:
+                async with self._request_slot():
+                    result = await self._agenerate(messages, json_schema)
+                break
+            except Exception as e:
+                if not _is_provider_error(e):
+                    raise
+                delay = self._retry_delay(e, attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+        return self._finish(result, cache_key, started, None, attempt)
+        
+    def stream_response(self, messages: List[Dict[str, str]]) -> Iterator[StreamChunk]:
+        """Stream a response token by token, finishing with its LLMResult
+        
+        A failed request is only retried while nothing has been streamed yet;
+        once text has been shown, the error is raised instead of repeating it.
+        A cached response is replayed as a single chunk.
+        """
+        started = time.perf_counter()
+        cache_key = self._cache_key(messages)
+        cached = self._cache_lookup(cache_key, started)
+        if cached is not None:
+            yield cached.text, None
+            yield "", cached
+            return
+            
+        attempt = 0
+        while True:
+            self._acquire(messages)
+            parts = []
+            first_token = None
+            try:
+                for delta, result in self._stream(messages):
+                    if result is not None:
+                        result.text = "".join(parts)
+                        yield "", self._finish(result, cache_key, started, first_token, attempt)
+                        return
+                    if delta:
+                        first_token = first_token or time.perf_counter()
+                        parts.append(delta)
+                        yield delta, None
+                return
+            except Exception as e:
+                if not _is_provider_error(e):
+                    raise
+                if parts:
+                    raise self._translate_error(e) from e
+                delay = self._retry_delay(e, attempt)
+            time.sleep(delay)
+            attempt += 1
+            
+    async def astream_response(self, messages: List[Dict[str, str]]) -> AsyncIterator[StreamChunk]:
+        """Asynchronously stream a response token by token, finishing with its LLMResult"""
+        started = time.perf_counter()
+        cache_key = self._cache_key(messages)
+        cached = self._cache_lookup(cache_key, started)
+        if cached is not None:
+            yield cached.text, None
+            yield "", cached
+            return
+            
+        attempt = 0
+        while True:
+            await self._aacquire(messages)
+            parts = []
+            first_token = None
+            try:
+                async with self._request_slot():
+                    async for delta, result in self._astream(messages):
+                        if result is not None:
+                            result.text = "".join(parts)
+                            yield "", self._finish(result, cache_key, started, first_token, attempt)
+                            return
+                        if delta:
+                            first_token = first_token or time.perf_counter()
+                            parts.append(delta)
+                            yield delta, None
+                return
+            except Exception as e:
+                if not _is_provider_error(e):
+                    raise
+                if parts:
+                    raise self._translate_error(e) from e
+                delay = self._retry_delay(e, attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+            
+    def _request_slot(self):
+        return self.request_slots or contextlib.nullcontext()
+        
+    def _finish(self, result: LLMResult, cache_key: Optional[str], started: float,
+                first_token: Optional[float], retries: int) -> LLMResult:
+        """Fill in timing and cost, charge the rate limiter and cache the result"""
+        finished = time.perf_counter()
+        result.latency = round(finished - started, 3)
+        result.time_to_first_token = round((first_token or finished) - started, 3)
+        result.retries = retries
+        if not result.completion_tokens:
+            result.completion_tokens = len(result.text) // 4  # provider sent no usage
+        result.cost = self._cost(result)
+        self._record_completion(result.completion_tokens)
+        if cache_key is not None:
+            self.cache.set(cache_key, result.to_dict())
+        return result
+        
+    def _cost(self, result: LLMResult) -> Optional[float]:
+        """Dollar cost from the per-million-token prices in LLMConfig"""
+        if self.config.input_cost_per_mtok is None or self.config.output_cost_per_mtok is None:
+            return None
+        # Cache reads and writes are billed at different rates; price them as input
+        prompt_tokens = result.prompt_tokens + result.cache_read_tokens + result.cache_write_tokens
+        return round((prompt_tokens * self.config.input_cost_per_mtok
+                      + result.completion_tokens * self.config.output_cost_per_mtok) / 1_000_000, 6)
+            
+    def _cache_key(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> Optional[str]:
+        """Content address of a request: model, messages, sampling settings and output schema"""
+        if self.cache is None:
+            return None
+        request = {
+            "provider": self.provider_id,
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens
+        }
+        if json_schema is not None:
+            request["json_schema"] = json_schema
+        return make_cache_key(request)
+        
+    def _cache_lookup(self, cache_key: Optional[str], started: float) -> Optional[LLMResult]:
+        """Rebuild a cached result; a replay is timed afresh and costs nothing"""
+        if cache_key is None:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+        result = LLMResult.from_dict(cached)
+        result.latency = result.time_to_first_token = round(time.perf_counter() - started, 3)
+        result.cost = 0.0
+        result.retries = 0
+        result.cached = True
+        return result
+        
+    def _generate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
         raise NotImplementedError
+        
+    async def _agenerate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        raise NotImplementedError
+        
+    def _stream(self, messages: List[Dict[str, str]]) -> Iterator[StreamChunk]:
+        raise NotImplementedError
+        
+    def _astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[StreamChunk]:
+        raise NotImplementedError
+        
+    def _acquire(self, messages: List[Dict[str, str]]):
+        """Wait for room under the requests/min and tokens/min limits"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(estimate_tokens(messages))
+            
+    async def _aacquire(self, messages: List[Dict[str, str]]):
+        if self.rate_limiter:
+            await self.rate_limiter.aacquire(estimate_tokens(messages))
+            
+    def _record_completion(self, completion_tokens: int):
+        if self.rate_limiter:
+            self.rate_limiter.record_completion(completion_tokens)
+            
+    def _translate_error(self, exc: Exception) -> LLMProviderError:
+        """Map an SDK exception onto the provider error hierarchy"""
+        if isinstance(exc, LLMProviderError):
+            return exc
+        status_code = getattr(exc, "status_code", None)
+        response = getattr(exc, "response", None)
+        retry_after = _parse_retry_after(getattr(response, "headers", None))
+        message = f"{self.name} ({self.config.model}): {exc}"
+        if status_code == 429:
+            return LLMRateLimitError(message, status_code, retry_after)
+        if status_code in (408, 409) or (status_code or 0) >= 500 or _is_connection_error(exc):
+            return LLMUnavailableError(message, status_code, retry_after)
+        return LLMProviderError(message, status_code)
+        
+    def _retry_delay(self, exc: Exception, attempt: int) -> float:
+        """Return how long to wait before retrying, or raise if we should give up"""
+        error = self._translate_error(exc)
+        if not error.retryable or attempt >= self.config.max_retries:
+            raise error from exc
+        if error.retry_after is not None:
+            # Honour the server's delay, plus a little jitter to spread retries
+            return error.retry_after + random.uniform(0, self.config.retry_base_delay)
+        # Exponential backoff with full jitter
+        ceiling = min(self.config.retry_max_delay, self.config.retry_base_delay * 2 ** attempt)
+        return random.uniform(0, ceiling)
 
+@register_provider("openai")
 class OpenAIProvider(BaseLLMProvider):
     """OpenAI API provider"""
     
-    def __init__(self, config: LLMConfig):
-        super().__init__(config)
-        self.client = openai.OpenAI(api_key=config.api_key)
+    def _build_client(self, http_client, asynchronous: bool):
+        import openai
+        client_class = openai.AsyncOpenAI if asynchronous else openai.OpenAI
+        # Retries are handled by BaseLLMProvider so they can honour our rate limits
+        return client_class(api_key=self.config.api_key, base_url=self.config.base_url,
+                            http_client=http_client, max_retries=0)
+                            
+    def _request_kwargs(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build the chat completion request, with structured outputs when a schema is given"""
+        request = {
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens
+        }
+        if json_schema is not None:
+            request["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": json_schema.get("title", "response"), "schema": json_schema}
+            }
+        return request
         
-    def generate_response(self, messages: List[Dict[str, str]]) -> str:
-        try:
-            response = self.client.chat.completions.create(
-                model=self.config.model,
-                messages=messages,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
+    def _result(self, text: str, usage, finish_reason: Optional[str]) -> LLMResult:
+        return LLMResult(
+            text=text,
+            model=self.config.model,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            finish_reason=finish_reason
+        )
+        
+    def _generate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        response = self.client.chat.completions.create(**self._request_kwargs(messages, json_schema))
+        choice = response.choices[0]
+        return self._result(choice.message.content or "", response.usage, choice.finish_reason)
+        
+    async def _agenerate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        response = await self.async_client.chat.completions.create(**self._request_kwargs(messages, json_schema))
+        choice = response.choices[0]
+        return self._result(choice.message.content or "", response.usage, choice.finish_reason)
+        
+    def _stream(self, messages: List[Dict[str, str]]) -> Iterator[StreamChunk]:
+        usage = None
+        finish_reason = None
+        stream = self.client.chat.completions.create(
+            **self._request_kwargs(messages),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            usage = chunk.usage or usage
+            if chunk.choices:
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content, None
+        yield "", self._result("", usage, finish_reason)
+        
+    async def _astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[StreamChunk]:
+        usage = None
+        finish_reason = None
+        stream = await self.async_client.chat.completions.create(
+            **self._request_kwargs(messages),
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            usage = chunk.usage or usage
+            if chunk.choices:
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content, None
+        yield "", self._result("", usage, finish_reason)
 
+@register_provider("anthropic")
 class AnthropicProvider(BaseLLMProvider):
     """Anthropic API provider"""
     
-    def __init__(self, config: LLMConfig):
-        super().__init__(config)
-        self.client = anthropic.Anthropic(api_key=config.api_key)
-        
-    def generate_response(self, messages: List[Dict[str, str]]) -> str:
-        try:
-            # Convert OpenAI format to Anthropic format
-            prompt = self._convert_messages_to_prompt(messages)
-            
-            response = self.client.messages.create(
-                model=self.config.model,
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
+    def _build_client(self, http_client, asynchronous: bool):
+        import anthropic
+        client_class = anthropic.AsyncAnthropic if asynchronous else anthropic.Anthropic
+        return client_class(api_key=self.config.api_key, base_url=self.config.base_url,
+                            http_client=http_client, max_retries=0)
+                            
+    # Anthropic allows at most four cache_control breakpoints per request
+    CACHE_CONTROL = {"type": "ephemeral"}
     
-    def _convert_messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
-        """Convert OpenAI message format to Anthropic prompt format"""
-        prompt = ""
+    def _request_kwargs(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build a native multi-turn messages request with prompt-cache breakpoints
+        
+        A schema becomes a single forced tool whose input is the JSON reply.
+        """
+        request = {
+            "model": self.config.model,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
+            "messages": self._convert_messages(messages)
+        }
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system" and m["content"])
+        if system:
+            request["system"] = [{"type": "text", "text": system, "cache_control": self.CACHE_CONTROL}]
+        if json_schema is not None:
+            name = json_schema.get("title", "respond").lower()
+            request["tools"] = [{"name": name, "description": "Submit the response", "input_schema": json_schema}]
+            request["tool_choice"] = {"type": "tool", "name": name}
+        return request
+        
+    def _convert_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Convert OpenAI chat messages into alternating Anthropic turns
+        
+        Consecutive messages with the same role are merged, because the API
+        requires strictly alternating user/assistant turns starting with user.
+        The newest message gets a cache breakpoint so the next request reads
+        the whole history back from the prompt cache. The message two back
+        gets one too: it was the newest when this speaker last replied, so it
+        marks the prefix the previous request wrote.
+        """
+        turns = []
+        blocks = []
         for message in messages:
             role = message["role"]
-            content = message["content"]
-            if role == "system":
-                prompt += f"System: {content}\n\n"
-            elif role == "user":
-                prompt += f"Human: {content}\n\n"
-            elif role == "assistant":
-                prompt += f"Assistant: {content}\n\n"
-        prompt += "Assistant:"
-        return prompt
+            if role == "system" or not message["content"]:
+                continue  # system goes top-level; empty text blocks are rejected
+            block = {"type": "text", "text": message["content"]}
+            blocks.append(block)
+            if turns and turns[-1]["role"] == role:
+                turns[-1]["content"].append(block)
+            else:
+                turns.append({"role": role, "content": [block]})
+                
+        for block in blocks[-1:] + blocks[-3:-2]:
+            block["cache_control"] = self.CACHE_CONTROL
+            
+        if not turns or turns[0]["role"] != "user":
+            turns.insert(0, {"role": "user", "content": [{"type": "text", "text": "Let's begin."}]})
+        if turns[-1]["role"] != "user":
+            # A trailing assistant turn would be treated as a prefill to continue
+            turns.append({"role": "user", "content": [{"type": "text", "text": "Please continue the conversation."}]})
+        return turns
+        
+    def _result(self, message) -> LLMResult:
+        """Text, stop reason and token usage including prompt-cache reads and writes"""
+        usage = message.usage
+        tool_inputs = [block.input for block in message.content if block.type == "tool_use"]
+        return LLMResult(
+            text=json.dumps(tool_inputs[0]) if tool_inputs else
+                "".join(block.text for block in message.content if block.type == "text"),
+            model=self.config.model,
+            prompt_tokens=usage.input_tokens,
+            completion_tokens=usage.output_tokens,
+            finish_reason=message.stop_reason,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+            cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0
+        )
+        
+    def _generate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        return self._result(self.client.messages.create(**self._request_kwargs(messages, json_schema)))
+        
+    async def _agenerate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        return self._result(await self.async_client.messages.create(**self._request_kwargs(messages, json_schema)))
+        
+    def _stream(self, messages: List[Dict[str, str]]) -> Iterator[StreamChunk]:
+        with self.client.messages.stream(**self._request_kwargs(messages)) as stream:
+            for text in stream.text_stream:
+                yield text, None
+            final = stream.get_final_message()
+        yield "", self._result(final)
+        
+    async def _astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[StreamChunk]:
+        async with self.async_client.messages.stream(**self._request_kwargs(messages)) as stream:
+            async for text in stream.text_stream:
+                yield text, None
+            final = await stream.get_final_message()
+        yield "", self._result(final)
 
+@register_provider("groq")
 class GroqProvider(BaseLLMProvider):
     """Groq API provider for Kimi K2 and other Groq models"""
-    def __init__(self, config: LLMConfig):
-        super().__init__(config)
-        self.client = groq.Groq(api_key=config.api_key)
-    def generate_response(self, messages: List[Dict[str, str]]) -> str:
-        try:
-            response = self.client.chat.completions.create(
-                model=self.config.model,
-                messages=messages,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
-
-def create_llm_provider(config: LLMConfig) -> BaseLLMProvider:
+    def _build_client(self, http_client, asynchronous: bool):
+        import groq
+        client_class = groq.AsyncGroq if asynchronous else groq.Groq
+        return client_class(api_key=self.config.api_key, base_url=self.config.base_url,
+                            http_client=http_client, max_retries=0)
+    def _request_kwargs(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build the chat completion request; Groq's JSON mode stands in for a schema"""
+        request = {
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens
+        }
+        if json_schema is not None:
+            # Not every Groq model supports json_schema, but all support JSON mode
+            request["response_format"] = {"type": "json_object"}
+        return request
+    def _result(self, text: str, usage, finish_reason: Optional[str]) -> LLMResult:
+        return LLMResult(text=text, model=self.config.model,
+                         prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                         completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+                         finish_reason=finish_reason)
+    def _generate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        response = self.client.chat.completions.create(**self._request_kwargs(messages, json_schema))
+        choice = response.choices[0]
+        return self._result(choice.message.content or "", response.usage, choice.finish_reason)
+    async def _agenerate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        response = await self.async_client.chat.completions.create(**self._request_kwargs(messages, json_schema))
+        choice = response.choices[0]
+        return self._result(choice.message.content or "", response.usage, choice.finish_reason)
+    def _stream(self, messages: List[Dict[str, str]]) -> Iterator[StreamChunk]:
+        usage = None
+        finish_reason = None
+        stream = self.client.chat.completions.create(**self._request_kwargs(messages), stream=True)
+        for chunk in stream:
+            # Groq reports usage on the final chunk under x_groq
+            if chunk.x_groq and chunk.x_groq.usage:
+                usage = chunk.x_groq.usage
+            if chunk.choices:
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content, None
+        yield "", self._result("", usage, finish_reason)
+    async def _astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[StreamChunk]:
+        usage = None
+        finish_reason = None
+        stream = await self.async_client.chat.completions.create(**self._request_kwargs(messages), stream=True)
+        async for chunk in stream:
+            if chunk.x_groq and chunk.x_groq.usage:
+                usage = chunk.x_groq.usage
+            if chunk.choices:
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content, None
+        yield "", self._result("", usage, finish_reason)
+
+@register_provider("mock")
+class MockProvider(BaseLLMProvider):
+    """Offline provider for tests and benchmarks, configured via ``LLMConfig.options``
+    
+    In ``replay`` mode it returns recorded turns in order, from a ``transcript``
+    file (optionally only one ``speaker``'s turns) or an inline ``responses``
+    list. In ``synthetic`` mode it writes ``response_words`` of filler text,
+    derived from the request so identical requests get identical replies,
+    or, when a ``json_schema`` is requested, a JSON object matching it whose
+    string-keyed maps are keyed by the speakers of the numbered turns
+    ("3. Name: ...") in the prompt. Time to first token follows ``latency`` ("fixed", "uniform" or
+    "lognormal") with ``latency_mean``/``latency_stddev`` seconds, text then
+    streams at ``tokens_per_second``, and ``error_rate`` of requests fail with
+    HTTP ``error_status``. All randomness is seeded from ``seed``.
+    """
+    
+    VOCABULARY = (
+        "conversation", "model", "idea", "context", "question", "reason", "future",
+        "language", "system", "example", "point", "argument", "evidence", "balance",
+        "think", "consider", "suggest", "explore", "agree", "wonder", "notice",
+        "interesting", "important", "careful", "open", "practical", "broader",
+        "the", "a", "and", "of", "to", "that", "we", "it", "this", "with", "about"
+    )
+    
+    def __init__(self, config: LLMConfig, cache: Optional[ResponseCache] = None):
+        super().__init__(config, cache)
+        self.options = dict(config.options)
+        self.random = random.Random(self.options.get("seed", 0))
+        self.calls = 0
+        self.replies = self._load_replies() if self.options.get("mode") == "replay" else []
+        
+    def _load_replies(self) -> List[str]:
+        if "responses" in self.options:
+            replies = list(self.options["responses"])
+        else:
+            turns = load_transcript(self.options["transcript"])
+            speaker = self.options.get("speaker")
+            replies = [turn["content"] for turn in turns
+                       if (turn["speaker"] == speaker if speaker else turn["role"] == "assistant")]
+        if not replies:
+            raise ValueError(f"{self.name}: nothing to replay")
+        return replies
+        
+    def _synthetic_text(self, messages: List[Dict[str, str]]) -> str:
+        rng = random.Random(make_cache_key({"seed": self.options.get("seed", 0), "messages": messages}))
+        words = [rng.choice(self.VOCABULARY) for _ in range(self.options.get("response_words", 60))]
+        sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, len(words), 12)]
+        return " ".join(sentences)
+        
+    def _schema_value(self, schema: Dict[str, Any], rng: random.Random, keys: List[str]) -> Any:
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+        if "anyOf" in schema:
+            return self._schema_value(schema["anyOf"][0], rng, keys)
+        kind = schema.get("type", "object")
+        if kind in ("number", "integer"):
+            value = rng.uniform(schema.get("minimum", 0), schema.get("maximum", 10))
+            return round(value) if kind == "integer" else round(value, 1)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        if kind == "string":
+            return " ".join(rng.choice(self.VOCABULARY) for _ in range(8)).capitalize() + "."
+        if kind == "array":
+            return [self._schema_value(schema.get("items", {}), rng, keys) for _ in range(2)]
+        if kind == "object":
+            if "properties" in schema:
+                return {name: self._schema_value(prop, rng, keys) for name, prop in schema["properties"].items()}
+            values = schema.get("additionalProperties")
+            return {key: self._schema_value(values, rng, keys) for key in keys} if isinstance(values, dict) else {}
+        return None
+        
+    def _synthetic_json(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any]) -> str:
+        rng = random.Random(make_cache_key({"seed": self.options.get("seed", 0), "messages": messages,
+                                            "json_schema": json_schema}))
+        speakers = re.findall(r"^\d+\. ([^:\n]+):", "\n".join(msg["content"] for msg in messages), re.MULTILINE)
+        return json.dumps(self._schema_value(json_schema, rng, list(dict.fromkeys(speakers))))
+        
+    def _first_token_delay(self) -> float:
+        mean = self.options.get("latency_mean", 0.0)
+        stddev = self.options.get("latency_stddev", 0.0)
+        distribution = self.options.get("latency", "fixed")
+        if mean <= 0 or distribution == "fixed":
+            return max(0.0, mean)
+        if distribution == "uniform":
+            return self.random.uniform(max(0.0, mean - stddev), mean + stddev)
+        if distribution == "lognormal":
+            # Parameterised by the mean and standard deviation of the delay itself
+            sigma2 = math.log(1 + (stddev / mean) ** 2)
+            return self.random.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        raise ValueError(f"Unknown latency distribution: {distribution}")
+        
+    def _plan(self, messages: List[Dict[str, str]],
+              json_schema: Dict[str, Any] = None) -> Tuple[LLMResult, List[str], float, float]:
+        """Decide the reply, its chunks and timing, or fail like a real API would"""
+        self.calls += 1
+        if self.random.random() < self.options.get("error_rate", 0.0):
+            status = self.options.get("error_status", 503)
+            error_class = LLMRateLimitError if status == 429 else LLMUnavailableError
+            raise error_class(f"{self.name} ({self.config.model}): injected HTTP {status}", status)
+            
+        if self.replies:
+            text = self.replies[(self.calls - 1) % len(self.replies)]
+        elif json_schema is not None:
+            text = self._synthetic_json(messages, json_schema)
+        else:
+            text = self._synthetic_text(messages)
+        chunks = re.findall(r"\S+\s*", text)
+        rate = self.options.get("tokens_per_second")
+        interval = 1 / rate if rate else 0.0
+        result = LLMResult(text=text, model=self.config.model, prompt_tokens=estimate_tokens(messages),
+                           completion_tokens=len(chunks), finish_reason="stop")
+        return result, chunks, self._first_token_delay(), interval
+        
+    def _generate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        result, chunks, delay, interval = self._plan(messages, json_schema)
+        time.sleep(delay + interval * len(chunks))
+        return result
+        
+    async def _agenerate(self, messages: List[Dict[str, str]], json_schema: Dict[str, Any] = None) -> LLMResult:
+        result, chunks, delay, interval = self._plan(messages, json_schema)
+        await asyncio.sleep(delay + interval * len(chunks))
+        return result
+        
+    def _stream(self, messages: List[Dict[str, str]]) -> Iterator[StreamChunk]:
+        result, chunks, delay, interval = self._plan(messages)
+        time.sleep(delay)
+        for chunk in chunks:
+            yield chunk, None
+            if interval:
+                time.sleep(interval)
+        yield "", result
+        
+    async def _astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[StreamChunk]:
+        result, chunks, delay, interval = self._plan(messages)
+        await asyncio.sleep(delay)
+        for chunk in chunks:
+            yield chunk, None
+            if interval:
+                await asyncio.sleep(interval)
+        yield "", result
+
+def infer_provider(model: str) -> str:
+    """Guess the provider ID from a model name"""
+    for hint, provider_id in MODEL_NAME_HINTS:
+        if hint in model.lower():
+            return provider_id
+    raise ValueError(f"Unsupported model: {model}")
+
+def create_llm_provider(config: LLMConfig, cache: Optional[ResponseCache] = None) -> BaseLLMProvider:
     """Factory function to create the appropriate LLM provider"""
-    if "kimi" in config.model.lower() or "groq" in config.model.lower():
-        return GroqProvider(config)
-    if "qwen" in config.model.lower() or "groq" in config.model.lower():
-        return GroqProvider(config)
-    if "llama" in config.model.lower() or "groq" in config.model.lower():
-        return GroqProvider(config)            
-    elif "gpt" in config.model.lower():
-        return OpenAIProvider(config)
-    elif "claude" in config.model.lower():
-        return AnthropicProvider(config)
-    else:
-        raise ValueError(f"Unsupported model: {config.model}") 
\ No newline at end of file
+    provider_id = config.provider or infer_provider(config.model)
+    if provider_id not in PROVIDER_REGISTRY:
+        raise ValueError(f"Unknown provider: {provider_id}. Available: {list(PROVIDER_REGISTRY.keys())}")
+    return PROVIDER_REGISTRY[provider_id](config, cache)
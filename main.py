@@ -10,14 +10,28 @@ from rich.prompt import Prompt, Confirm
 from rich.table import Table
 from rich import print as rprint
 
-from config import DEFAULT_LLMS, DialogueConfig
-from dialogue_manager import DialogueManager
-from judge_model import ConversationJudge
+from config import DEFAULT_LLMS, DialogueConfig, CacheConfig
+from transcript import FSYNC_POLICIES
 import os
+import sys
+import time
+from typing import List
+
+# DialogueManager, ConversationJudge and the provider SDKs are imported inside
+# the commands that need them, so `list-llms`, `setup` and `--help` start fast.
 
 app = typer.Typer()
 console = Console()
 
+OUTPUT_MODES = ("rich", "jsonl", "quiet")
+
+PROVIDER_NAMES = {
+    "groq": "Groq",
+    "openai": "OpenAI",
+    "anthropic": "Anthropic",
+    "mock": "Mock (offline)"
+}
+
 @app.command()
 def start(
     llm1: str = typer.Option("kimi-k2", "--llm1", "-1", help="First LLM (kimi-k2, qwen3-32b, llama-3.3-70b, gpt-4o, claude-3.5-sonnet)"),
@@ -25,16 +39,92 @@ def start(
     rounds: int = typer.Option(2, "--rounds", "-r", help="Number of dialogue rounds"),
     message: str = typer.Option(None, "--message", "-m", help="Initial message to start the conversation"),
     save: bool = typer.Option(False, "--save", "-s", help="Save conversation to file"),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Render responses token by token as they arrive"),
+    context_policy: str = typer.Option("full", "--context-policy", help="History sent each turn: full, sliding_window, pin_first or summary"),
+    max_context_tokens: int = typer.Option(8000, "--max-context-tokens", help="Token budget for the history sent each turn"),
+    judge: str = typer.Option("kimi-k2", "--judge", help="LLM that evaluates the finished conversation; comma-separated for an ensemble"),
+    judge_every: int = typer.Option(0, "--judge-every", help="Judge every N rounds in the background while the dialogue runs (0: once at the end)"),
+    chunk_tokens: int = typer.Option(0, "--chunk-tokens", help="Judge conversations longer than this many tokens in concurrent chunks (0: one prompt)"),
+    chunk_cache_path: str = typer.Option(".cache/judge_chunks.sqlite", "--chunk-cache", help="SQLite file caching chunk verdicts for --chunk-tokens"),
+    stop_on_convergence: bool = typer.Option(False, "--stop-on-convergence", help="End the dialogue once responses keep repeating each other"),
+    convergence_threshold: float = typer.Option(0.5, "--convergence-threshold", help="Word 3-gram Jaccard similarity that counts as repetition"),
+    stop_phrase: List[str] = typer.Option(None, "--stop-phrase", help="End the dialogue when a response contains this phrase; repeatable"),
+    output: str = typer.Option("rich", "--output", help="rich panels, jsonl events (one per turn) or quiet"),
+    events: str = typer.Option(None, "--events", help="Append JSONL events to this file instead of stdout"),
+    transcript: str = typer.Option(None, "--transcript", help="Append each turn to this JSONL file as it arrives (default with --save: dialogues/dialogue_<timestamp>.jsonl)"),
+    fsync: str = typer.Option("batch", "--fsync", help="When to fsync the transcript: always, batch or never"),
+    metrics: str = typer.Option(None, "--metrics", help="Write per-provider latency, TTFT, tokens/s and retry histograms to this JSON file"),
+    prometheus: str = typer.Option(None, "--prometheus", help="Write the same metrics to this file in Prometheus text format"),
+    resume: str = typer.Option(None, "--resume", help="Continue the dialogue saved in this transcript (.jsonl or .txt) up to --rounds"),
+    cache: bool = typer.Option(False, "--cache", help="Reuse cached responses for identical requests"),
+    cache_path: str = typer.Option(CacheConfig().path, "--cache-path", help="SQLite file backing the response cache"),
     interactive: bool = typer.Option(False, "--interactive", "-i", help="Interactive mode")
 ):
     """Start a dialogue between two LLMs"""
+    if output not in OUTPUT_MODES:
+        console.print(f"[red]Error: --output must be one of {', '.join(OUTPUT_MODES)}[/red]")
+        raise typer.Exit(1)
+    if fsync not in FSYNC_POLICIES:
+        console.print(f"[red]Error: --fsync must be one of {', '.join(FSYNC_POLICIES)}[/red]")
+        raise typer.Exit(1)
+    if resume and not transcript and resume.endswith(".jsonl"):
+        # Keep appending to the transcript being resumed
+        transcript = resume
+    if save and not transcript:
+        transcript = os.path.join("dialogues", f"dialogue_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+    if output == "jsonl" and not events:
+        # Keep stdout for events only
+        import judge_model
+        console.file = sys.stderr
+        judge_model.console.file = sys.stderr
+    elif output == "quiet":
+        # The judge's warnings print through its own console
+        import judge_model
+        judge_model.console.quiet = True
+    response_cache = open_cache(cache, cache_path)
     
     if interactive:
-        run_interactive_mode()
+        run_interactive_mode(response_cache)
     else:
-        run_direct_mode(llm1, llm2, rounds, message, save)
+        options = {
+            "context_policy": context_policy,
+            "max_context_tokens": max_context_tokens,
+            "judge_model": judge,
+            "judge_every": judge_every,
+            "judge_chunk_tokens": chunk_tokens,
+            "judge_chunk_cache_path": chunk_cache_path,
+            "stop_on_convergence": stop_on_convergence,
+            "convergence_threshold": convergence_threshold,
+            "stop_phrases": stop_phrase or [],
+            "output": output,
+            "events_path": events,
+            "transcript_path": transcript,
+            "transcript_fsync": fsync,
+            "metrics_path": metrics,
+            "prometheus_path": prometheus
+        }
+        run_direct_mode(llm1, llm2, rounds, message, save, stream, response_cache, options, resume)
+    
+    show_cache_stats(response_cache)
+
+def open_cache(enabled: bool, path: str):
+    """Create the response cache if caching was requested"""
+    if not enabled:
+        return None
+    from response_cache import ResponseCache
+    return ResponseCache(CacheConfig(path=path))
 
-def run_interactive_mode():
+def show_cache_stats(response_cache):
+    """Print the response cache hit/miss counters"""
+    if response_cache is None:
+        return
+    stats = response_cache.stats()
+    console.print(
+        f"[dim]Response cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate)[/dim]"
+    )
+
+def run_interactive_mode(response_cache=None):
     """Run in interactive mode with prompts"""
     console.print(Panel(
         "🤖 Welcome to LLM Dialogue!\n"
@@ -75,9 +165,9 @@ def run_interactive_mode():
     save = Confirm.ask("Save conversation to file?")
     
     # Run the dialogue
-    run_dialogue(llm1, llm2, rounds, message, save)
+    run_dialogue(llm1, llm2, rounds, message, save, cache=response_cache)
 
-def run_direct_mode(llm1: str, llm2: str, rounds: int, message: str, save: bool):
+def run_direct_mode(llm1: str, llm2: str, rounds: int, message: str, save: bool, stream: bool = True, cache=None, options: dict = None, resume: str = None):
     """Run in direct mode with provided parameters"""
     if not llm1 or not llm2:
         console.print("[red]Error: Both --llm1 and --llm2 are required in direct mode[/red]")
@@ -86,29 +176,38 @@ def run_direct_mode(llm1: str, llm2: str, rounds: int, message: str, save: bool)
     if not message:
         message = "Hello! Let's have an interesting conversation about artificial intelligence and its future."
     
-    run_dialogue(llm1, llm2, rounds, message, save)
+    run_dialogue(llm1, llm2, rounds, message, save, stream, cache, options, resume)
 
-def run_dialogue(llm1: str, llm2: str, rounds: int, message: str, save: bool):
+def run_dialogue(llm1: str, llm2: str, rounds: int, message: str, save: bool, stream: bool = True, cache=None, options: dict = None, resume: str = None):
     """Run the actual dialogue"""
+    from dialogue_manager import DialogueManager
+    
+    manager = None
     try:
         # Create dialogue manager
-        config = DialogueConfig(rounds=rounds)
-        manager = DialogueManager(llm1, llm2, config)
+        config = DialogueConfig(rounds=rounds, stream=stream, **(options or {}))
+        manager = DialogueManager(llm1, llm2, config, cache)
+        if resume:
+            manager.resume(resume)
         
         # Run the dialogue
         conversation = manager.run_dialogue(message, rounds)
         
-        # Save if requested
-        if save:
+        # Save if requested (unless the turns already went to a transcript as they arrived)
+        if save and manager.transcript is None:
             manager.save_conversation()
         
-        # Show summary
-        summary = manager.get_conversation_summary()
-        show_summary(summary)
+        # Show summary (headless runs emit it as the dialogue_end event)
+        if config.output == "rich":
+            show_summary(manager.get_conversation_summary())
         
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
         raise typer.Exit(1)
+    finally:
+        # Also on Ctrl-C, so the transcript keeps every completed turn
+        if manager is not None:
+            manager.close()
 
 def show_available_llms():
     """Display available LLMs in a table"""
@@ -118,18 +217,7 @@ def show_available_llms():
     table.add_column("Provider", style="green")
     
     for key, config in DEFAULT_LLMS.items():
-        if key == "kimi-k2":
-            provider = "Groq"
-        elif key == "llama-3.3-70b":
-            provider = "Groq"
-        elif key == "qwen3-32b":
-            provider = "Groq"
-        elif key == "gpt-4o":
-            provider = "OpenAI"
-        elif key == "claude-3.5-sonnet":
-            provider = "Anthropic"
-        else:
-            provider = "Unknown"
+        provider = PROVIDER_NAMES.get(config.provider, config.provider or "Unknown")
         table.add_row(key, config.model, provider)
     
     console.print(table)
@@ -145,8 +233,36 @@ def show_summary(summary: dict):
     table.add_row("LLM 2", summary["llm2"])
     table.add_row("Total Messages", str(summary["total_messages"]))
     table.add_row("Rounds Completed", str(summary["rounds"]))
+    if summary.get("stop_reason"):
+        table.add_row("Stopped Early", summary["stop_reason"])
+    saved = sum(totals.get("context_tokens_saved", 0) for totals in summary.get("usage", {}).values())
+    if saved:
+        table.add_row("Context Tokens Saved", str(saved))
+    if summary.get("total_cost") is not None:
+        table.add_row("Total Cost", f"${summary['total_cost']:.4f}")
     
     console.print(table)
+    
+    if summary.get("usage"):
+        usage_table = Table(title="Usage per Model")
+        usage_table.add_column("LLM", style="cyan")
+        usage_table.add_column("Prompt", justify="right")
+        usage_table.add_column("Completion", justify="right")
+        usage_table.add_column("Latency", justify="right")
+        usage_table.add_column("TTFT", justify="right")
+        usage_table.add_column("Tok/s", justify="right")
+        usage_table.add_column("$/Round", justify="right", style="green")
+        for speaker, totals in summary["usage"].items():
+            usage_table.add_row(
+                speaker,
+                str(totals["prompt_tokens"]),
+                str(totals["completion_tokens"]),
+                f"{totals['avg_latency']:.2f}s",
+                f"{totals['avg_time_to_first_token']:.2f}s",
+                str(totals["tokens_per_second"] or "-"),
+                f"${totals['cost_per_round']:.4f}" if totals["cost_per_round"] is not None else "-"
+            )
+        console.print(usage_table)
 
 @app.command()
 def list_llms():
@@ -171,53 +287,220 @@ def setup():
 
 @app.command()
 def evaluate(
-    file_path: str = typer.Argument(..., help="Path to the conversation file to evaluate")
+    paths: List[str] = typer.Argument(..., help="Transcripts, directories or glob patterns to evaluate"),
+    judge: str = typer.Option("kimi-k2", "--judge", help="LLM that evaluates the conversations; comma-separated for an ensemble, e.g. kimi-k2,qwen3-32b,llama-3.3-70b"),
+    max_concurrency: int = typer.Option(8, "--max-concurrency", help="Transcripts judged at the same time"),
+    chunk_tokens: int = typer.Option(0, "--chunk-tokens", help="Judge transcripts longer than this many tokens in cached, concurrent chunks (0: one prompt)"),
+    prefilter: float = typer.Option(None, "--prefilter", help="Only send transcripts whose offline heuristic overall score is at least this to the judge"),
+    output: str = typer.Option(None, "--output", "-o", help="JSONL results file (default for several transcripts: evaluations/evaluations_<timestamp>.jsonl)"),
+    rescore: bool = typer.Option(False, "--rescore", help="Judge again even if a verdict for this transcript, judge and rubric is cached"),
+    results_cache_path: str = typer.Option(".cache/evaluations.sqlite", "--results-cache", help="SQLite file caching verdicts"),
+    cache: bool = typer.Option(False, "--cache", help="Also reuse cached judge responses for identical prompts"),
+    cache_path: str = typer.Option(CacheConfig().path, "--cache-path", help="SQLite file backing the response cache")
 ):
-    """Evaluate an existing conversation using the judge model"""
-    if not os.path.exists(file_path):
-        console.print(f"[red]Error: File {file_path} not found[/red]")
+    """Evaluate saved conversations using the judge model"""
+    from evaluation_runner import EvaluationRunner, expand_paths
+    from response_cache import ResponseCache
+    
+    files = expand_paths(paths)
+    missing = [path for path in files if not os.path.exists(path)]
+    if missing or not files:
+        console.print(f"[red]Error: no transcripts found at {', '.join(missing or paths)}[/red]")
+        raise typer.Exit(1)
+    if len(files) > 1 and not output:
+        output = os.path.join("evaluations", time.strftime("evaluations_%Y%m%d_%H%M%S.jsonl"))
+    
+    response_cache = open_cache(cache, cache_path)
+    runner = EvaluationRunner(judge, max_concurrency, response_cache,
+                              ResponseCache(CacheConfig(path=results_cache_path)), rescore, chunk_tokens, prefilter)
+    if len(files) > 1:
+        console.print(f"[bold]Evaluating {len(files)} transcripts ({max_concurrency} at a time) with {judge}...[/bold]")
+    summary, records = runner.run(files, output)
+    
+    if len(files) == 1:
+        record = records[0]
+        if record["status"] == "failed":
+            console.print(f"[red]Error evaluating conversation: {record['error']}[/red]")
+            raise typer.Exit(1)
+        if record["cached"]:
+            console.print(f"[dim]Cached verdict (judge {judge}, rubric v{record['rubric_version']})[/dim]")
+        if record["status"] == "filtered":
+            console.print(f"[dim]Heuristic score below --prefilter {prefilter}; not sent to the judge[/dim]")
+        runner.judge.display_evaluation(record["evaluation"])
+    else:
+        show_evaluation_summary(summary)
+    show_cache_stats(response_cache)
+    if summary["failed"]:
         raise typer.Exit(1)
+
+def show_evaluation_summary(summary: dict):
+    """Display counts and score statistics for a batch of evaluations"""
+    table = Table(title=f"Evaluation of {summary['transcripts']} transcripts")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Mean", justify="right", style="green")
+    table.add_column("Std Dev", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Max", justify="right")
+    
+    for key, stats in summary["scores"].items():
+        label = key.replace("_score", "").replace("_", " ").title()
+        table.add_row(label, f"{stats['mean']:.2f}", f"{stats['stddev']:.2f}", str(stats["min"]), str(stats["max"]))
+    
+    console.print(table)
+    console.print(f"Judged {summary['judged']}, cached {summary['cached']}, filtered {summary['filtered']}, "
+                  f"fallback {summary['fallback']}, failed {summary['failed']} in {summary['elapsed']}s")
+    if summary.get("agreement"):
+        console.print(f"Inter-judge agreement: mean {summary['agreement']['mean']}, min {summary['agreement']['min']}")
+    if summary.get("judge_parse_failures"):
+        console.print(f"[yellow]Judge replies failing the verdict schema: {summary['judge_parse_failures']} "
+                      f"({summary['judge_repairs']} repair prompts sent)[/yellow]")
+    if summary["results"]:
+        console.print(f"Results: {summary['results']}")
+
+@app.command()
+def batch(
+    spec: str = typer.Argument(..., help="JSONL file with one {llm1, llm2, rounds, message, id} job per line"),
+    output_dir: str = typer.Option(None, "--output-dir", "-o", help="Where transcripts, verdicts and results.jsonl go"),
+    max_concurrency: int = typer.Option(8, "--max-concurrency", help="Dialogues running at the same time"),
+    per_provider: int = typer.Option(4, "--per-provider", help="In-flight requests per provider across all dialogues"),
+    judge: str = typer.Option("kimi-k2", "--judge", help="LLM that evaluates each conversation; comma-separated for an ensemble"),
+    context_policy: str = typer.Option("full", "--context-policy", help="History sent each turn: full, sliding_window, pin_first or summary"),
+    max_context_tokens: int = typer.Option(8000, "--max-context-tokens", help="Token budget for the history sent each turn"),
+    cache: bool = typer.Option(False, "--cache", help="Reuse cached responses for identical requests"),
+    prometheus: bool = typer.Option(False, "--prometheus", help="Also write metrics.prom in Prometheus text format"),
+    cache_path: str = typer.Option(CacheConfig().path, "--cache-path", help="SQLite file backing the response cache")
+):
+    """Run many dialogues concurrently from a JSONL spec"""
+    from batch_runner import BatchRunner, load_jobs
     
-    # Read the conversation file
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Parse the conversation into the expected format
-        conversation_history = []
-        lines = content.split('\n\n')
-        
-        # Skip the first two lines which contain metadata
-        for i, line in enumerate(lines[2:], start=1):
-            if line.strip():
-                # Try to parse speaker and content
-                if ':' in line:
-                    parts = line.split(':', 1)
-                    speaker = parts[0].strip()
-                    message_content = parts[1].strip()
-                    
-                    # Determine role based on speaker
-                    if speaker == "User":
-                        role = "user"
-                    elif speaker.startswith("System"):
-                        role = "system"
-                    else:
-                        role = "assistant"
-                    
-                    conversation_history.append({
-                        "role": role,
-                        "content": message_content,
-                        "speaker": speaker
-                    })
-        
-        # Create judge and evaluate
-        judge = ConversationJudge()
-        evaluation = judge.judge_conversation(conversation_history)
-        judge.display_evaluation(evaluation)
-        
-    except Exception as e:
-        console.print(f"[red]Error evaluating conversation: {str(e)}[/red]")
+        jobs = load_jobs(spec)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error reading batch spec: {e}[/red]")
+        raise typer.Exit(1)
+    
+    output_dir = output_dir or os.path.join("batches", time.strftime("batch_%Y%m%d_%H%M%S"))
+    response_cache = open_cache(cache, cache_path)
+    runner = BatchRunner(
+        output_dir,
+        max_concurrency=max_concurrency,
+        per_provider_concurrency=per_provider,
+        judge_model=judge,
+        cache=response_cache,
+        dialogue_options={"context_policy": context_policy, "max_context_tokens": max_context_tokens},
+        prometheus=prometheus
+    )
+    
+    console.print(f"[bold]Running {len(jobs)} dialogues ({max_concurrency} at a time, {per_provider} requests per provider)...[/bold]")
+    summary = runner.run(jobs)
+    show_batch_summary(summary)
+    show_cache_stats(response_cache)
+    if summary["failed"]:
+        raise typer.Exit(1)
+
+@app.command()
+def tournament(
+    models: str = typer.Option(None, "--models", help="Comma-separated LLMs to compare (default: every configured non-mock LLM)"),
+    topic: List[str] = typer.Option(None, "--topic", "-t", help="Opening message; repeat for several topics"),
+    rounds: int = typer.Option(2, "--rounds", "-r", help="Rounds per match"),
+    output_dir: str = typer.Option(None, "--output-dir", "-o", help="Where results go; pass an existing directory to resume"),
+    max_concurrency: int = typer.Option(8, "--max-concurrency", help="Matches running at the same time"),
+    per_provider: int = typer.Option(4, "--per-provider", help="In-flight requests per provider across all matches"),
+    judge: str = typer.Option("kimi-k2", "--judge", help="LLM that scores each participant; comma-separated for an ensemble"),
+    k_factor: float = typer.Option(32.0, "--k-factor", help="Elo K-factor"),
+    cache: bool = typer.Option(False, "--cache", help="Reuse cached responses for identical requests"),
+    cache_path: str = typer.Option(CacheConfig().path, "--cache-path", help="SQLite file backing the response cache")
+):
+    """Play every pair of models on every topic and rate them with Elo"""
+    from tournament import Tournament
+    
+    names = [name.strip() for name in models.split(",")] if models else \
+        [name for name, config in DEFAULT_LLMS.items() if config.provider != "mock"]
+    unknown = [name for name in names if name not in DEFAULT_LLMS]
+    if unknown:
+        console.print(f"[red]Error: unknown LLMs: {', '.join(unknown)}[/red]")
+        raise typer.Exit(1)
+    
+    output_dir = output_dir or os.path.join("tournaments", time.strftime("tournament_%Y%m%d_%H%M%S"))
+    response_cache = open_cache(cache, cache_path)
+    try:
+        runner = Tournament(names, topic, output_dir, rounds, max_concurrency, per_provider,
+                            judge, response_cache, k_factor=k_factor)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"[bold]Tournament of {len(names)} models, {len(runner.schedule)} matches -> {output_dir}[/bold]")
+    summary, standings = runner.run()
+    if summary["skipped"]:
+        console.print(f"[dim]Resumed: {summary['skipped']} matches already played[/dim]")
+    show_batch_summary(summary)
+    if summary["unrated"]:
+        console.print(f"[yellow]{summary['unrated']} matches unrated: the judge gave no participant scores. "
+                      f"They are played again on the next run.[/yellow]")
+    show_standings(standings)
+    show_cache_stats(response_cache)
+    if summary["failed"]:
         raise typer.Exit(1)
 
+@app.command("convert-transcripts")
+def convert_transcripts(
+    paths: List[str] = typer.Argument(None, help="Text dialogues to convert (default: dialogues/*.txt)"),
+    force: bool = typer.Option(False, "--force", help="Overwrite existing .jsonl files")
+):
+    """Convert dialogues saved in the old text format to JSONL transcripts"""
+    import glob
+    from transcript import convert_text_transcript
+    
+    paths = paths or sorted(glob.glob(os.path.join("dialogues", "*.txt")))
+    converted = 0
+    for path in paths:
+        target = os.path.splitext(path)[0] + ".jsonl"
+        if os.path.exists(target) and not force:
+            console.print(f"[dim]Skipping {path}: {target} exists[/dim]")
+            continue
+        try:
+            convert_text_transcript(path, target)
+            converted += 1
+            console.print(f"[green]{path} -> {target}[/green]")
+        except (OSError, UnicodeDecodeError) as e:
+            console.print(f"[red]Could not convert {path}: {e}[/red]")
+    console.print(f"Converted {converted} of {len(paths)} files")
+
+def show_standings(standings: list):
+    """Display the Elo rating table"""
+    table = Table(title="Standings")
+    table.add_column("#", justify="right")
+    table.add_column("Model", style="cyan")
+    table.add_column("Elo", justify="right", style="green")
+    table.add_column("W-D-L", justify="right")
+    
+    for position, row in enumerate(standings, start=1):
+        table.add_row(str(position), row["model"], f"{row['rating']:.0f}", f"{row['wins']}-{row['draws']}-{row['losses']}")
+    
+    console.print(table)
+
+def show_batch_summary(summary: dict):
+    """Display batch throughput, failures and latency percentiles"""
+    table = Table(title="Batch Summary")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green")
+    
+    table.add_row("Jobs", str(summary["jobs"]))
+    table.add_row("Completed", str(summary["completed"]))
+    table.add_row("Converged Early", str(summary["converged"]))
+    table.add_row("Stopped Early", str(summary["stopped"]))
+    table.add_row("Failed", f"[red]{summary['failed']}[/red]" if summary["failed"] else "0")
+    table.add_row("Turns", str(summary["turns"]))
+    table.add_row("Wall Time", f"{summary['elapsed']}s")
+    table.add_row("Throughput", f"{summary['jobs_per_minute']} jobs/min, {summary['turns_per_second']} turns/s")
+    table.add_row("Completion Tokens/s", str(summary["completion_tokens_per_second"]))
+    for label, key in (("p50 Turn Latency", "p50_turn_latency"), ("p95 Turn Latency", "p95_turn_latency")):
+        table.add_row(label, f"{summary[key]:.2f}s" if summary[key] is not None else "-")
+    table.add_row("Results", summary["results"])
+    table.add_row("Metrics", summary["metrics"])
+    
+    console.print(table)
+
 if __name__ == "__main__":
     app() 
\ No newline at end of file
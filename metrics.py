@@ -0,0 +1,160 @@
+"""
+Metrics - Per-provider latency, TTFT, throughput and retry histograms
+"""
+
+import json
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from llm_providers import LLMResult
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+THROUGHPUT_BUCKETS = (5.0, 10.0, 25.0, 50.0, 100.0, 200.0, 400.0, 800.0)
+RETRY_BUCKETS = (0.0, 1.0, 2.0, 3.0, 5.0)
+
+# Histogram name -> (LLMResult attribute, buckets, help text)
+HISTOGRAMS = {
+    "request_latency_seconds": ("latency", LATENCY_BUCKETS, "Time from request to last token"),
+    "time_to_first_token_seconds": ("time_to_first_token", LATENCY_BUCKETS, "Time from request to first token"),
+    "tokens_per_second": ("tokens_per_second", THROUGHPUT_BUCKETS, "Completion tokens per second after the first token"),
+    "retries": ("retries", RETRY_BUCKETS, "Retries before the request succeeded")
+}
+
+COUNTERS = {
+    "requests_total": "Dialogue turns served",
+    "cached_total": "Turns answered from the response cache",
+    "errors_total": "Turns that ended the dialogue with a provider error",
+    "prompt_tokens_total": "Prompt tokens sent",
+    "completion_tokens_total": "Completion tokens received"
+}
+
+def _labels(provider: str, model: str) -> str:
+    escape = lambda value: value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'provider="{escape(provider)}",model="{escape(model)}"'
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        lower_bound, lower_count = 0.0, 0
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= rank:
+                width = count - lower_count
+                estimate = lower_bound + (bound - lower_bound) * ((rank - lower_count) / width if width else 1.0)
+                return round(min(max(estimate, self.min), self.max), 3)
+            lower_bound, lower_count = bound, count
+        # Beyond the last bucket
+        return round(self.max, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "mean": round(self.sum / self.count, 3) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        }
+
+class MetricsRegistry:
+    """Collects per-turn metrics keyed by (provider, model)
+
+    One registry can be shared by many dialogues, e.g. all jobs of a batch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def _series_for(self, provider: str, model: str) -> Dict[str, Any]:
+        key = (provider or "unknown", model or "unknown")
+        if key not in self._series:
+            series = {name: Histogram(buckets) for name, (_, buckets, _) in HISTOGRAMS.items()}
+            series.update({name: 0 for name in COUNTERS})
+            self._series[key] = series
+        return self._series[key]
+
+    def observe(self, provider: str, result: LLMResult):
+        """Record one request: a dialogue turn or a context summary"""
+        with self._lock:
+            series = self._series_for(provider, result.model)
+            series["requests_total"] += 1
+            series["prompt_tokens_total"] += result.prompt_tokens
+            series["completion_tokens_total"] += result.completion_tokens
+            if result.cached:
+                # Cache hits would make the provider look faster than it is
+                series["cached_total"] += 1
+                return
+            for name, (attribute, _, _) in HISTOGRAMS.items():
+                value = getattr(result, attribute)
+                if value is not None:
+                    series[name].observe(value)
+
+    def record_error(self, provider: str, model: str):
+        with self._lock:
+            self._series_for(provider, model)["errors_total"] += 1
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        """JSON report: one entry per provider and model"""
+        with self._lock:
+            return [
+                {"provider": provider, "model": model,
+                 **{name: series[name] for name in COUNTERS},
+                 **{name: series[name].to_dict() for name in HISTOGRAMS}}
+                for (provider, model), series in sorted(self._series.items())
+            ]
+
+    def to_prometheus(self, prefix: str = "llm_dialogue") -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            series_items = sorted(self._series.items())
+            for name, help_text in COUNTERS.items():
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for (provider, model), series in series_items:
+                    lines.append(f"{prefix}_{name}{{{_labels(provider, model)}}} {series[name]}")
+            for name, (_, _, help_text) in HISTOGRAMS.items():
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (provider, model), series in series_items:
+                    histogram = series[name]
+                    labels = _labels(provider, model)
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{prefix}_{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{prefix}_{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{prefix}_{name}_sum{{{labels}}} {round(histogram.sum, 6)}")
+                    lines.append(f"{prefix}_{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path: str = None, prometheus_path: str = None):
+        """Write the JSON report and/or the Prometheus text file"""
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        if prometheus_path:
+            with open(prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
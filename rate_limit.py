@@ -0,0 +1,95 @@
+"""
+Rate Limiting - Token buckets that keep providers under requests/min and tokens/min
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import LLMConfig
+
+class TokenBucket:
+    """Token bucket that refills continuously up to its capacity
+
+    Reservations may drive the bucket into debt; the caller then waits until
+    the debt has been refilled. This keeps reservation O(1) and lets the
+    same bucket serve threads and coroutines alike.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return how many seconds to wait before using them"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Never ask for more than a full bucket, or the wait would never end
+            self._tokens -= min(amount, self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def consume(self, amount: float):
+        """Charge tokens after the fact, e.g. once the real completion size is known"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one model and key"""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if tokens_per_minute else None
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        delays = [0.0]
+        if self.requests:
+            delays.append(self.requests.reserve(1))
+        if self.tokens:
+            delays.append(self.tokens.reserve(estimated_tokens))
+        return max(delays)
+
+    def acquire(self, estimated_tokens: int):
+        """Block until a request of this size fits under the limits"""
+        delay = self._reserve(estimated_tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, estimated_tokens: int):
+        """Wait without blocking the event loop until a request fits under the limits"""
+        delay = self._reserve(estimated_tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_completion(self, completion_tokens: int):
+        """Charge the tokens a response actually produced"""
+        if self.tokens and completion_tokens:
+            self.tokens.consume(completion_tokens)
+
+_limiters: Dict[Tuple[str, str, str], ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider_id: str, config: LLMConfig) -> Optional[ProviderRateLimiter]:
+    """Get the limiter shared by every provider using this model and API key"""
+    if not config.requests_per_minute and not config.tokens_per_minute:
+        return None
+    key = (provider_id, config.api_key, config.model)
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = ProviderRateLimiter(config.requests_per_minute, config.tokens_per_minute)
+        return _limiters[key]
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough prompt size in tokens (about four characters per token)"""
+    return sum(len(message.get("content") or "") for message in messages) // 4 + 4 * len(messages)
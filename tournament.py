@@ -0,0 +1,137 @@
+"""
+Tournament - Round-robin dialogues between models with Elo ratings
+"""
+
+import asyncio
+import itertools
+import json
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+from batch_runner import DEFAULT_MESSAGE, BatchJob, BatchRunner
+from response_cache import ResponseCache
+
+class EloTable:
+    """Elo ratings updated one match at a time"""
+
+    def __init__(self, k_factor: float = 32.0, initial: float = 1000.0):
+        self.k_factor = k_factor
+        self.initial = initial
+        self.ratings: Dict[str, float] = {}
+        self.records: Dict[str, Dict[str, int]] = {}
+
+    def add(self, model: str):
+        self.ratings.setdefault(model, self.initial)
+        self.records.setdefault(model, {"wins": 0, "draws": 0, "losses": 0})
+
+    def expected(self, a: str, b: str) -> float:
+        """Probability that ``a`` beats ``b``"""
+        return 1.0 / (1.0 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+
+    def update(self, a: str, b: str, score_a: float):
+        """Record a match; ``score_a`` is 1 for a win by ``a``, 0.5 for a draw, 0 for a loss"""
+        self.add(a)
+        self.add(b)
+        delta = self.k_factor * (score_a - self.expected(a, b))
+        self.ratings[a] += delta
+        self.ratings[b] -= delta
+        outcome = {1.0: ("wins", "losses"), 0.5: ("draws", "draws"), 0.0: ("losses", "wins")}[score_a]
+        self.records[a][outcome[0]] += 1
+        self.records[b][outcome[1]] += 1
+
+    def standings(self) -> List[Dict[str, Any]]:
+        """Models ordered by rating"""
+        return [{"model": model, "rating": round(rating, 1), **self.records[model]}
+                for model, rating in sorted(self.ratings.items(), key=lambda item: -item[1])]
+
+# Matches the judge gave no participant scores for are recorded as unrated
+# and, like failed matches, played again on the next run
+REPLAYED_STATUSES = ("failed", "unrated")
+
+def match_outcome(record: Dict[str, Any]) -> Optional[float]:
+    """Score of llm1 in a finished match, or None if it cannot be rated"""
+    scores = record.get("participant_scores") or {}
+    first, second = scores.get(record["llm1"]), scores.get(record["llm2"])
+    if record.get("status") == "failed" or first is None or second is None:
+        return None
+    return 1.0 if first > second else 0.0 if first < second else 0.5
+
+def build_schedule(models: List[str], topics: List[str], rounds: int) -> List[BatchJob]:
+    """Every pair of models on every topic, once with each model opening"""
+    jobs = []
+    for topic_index, topic in enumerate(topics):
+        for a, b in itertools.combinations(models, 2):
+            for first, second in ((a, b), (b, a)):
+                jobs.append(BatchJob(llm1=first, llm2=second, rounds=rounds, message=topic,
+                                     id=f"{first}__{second}__t{topic_index + 1}"))
+    return jobs
+
+class Tournament:
+    """Schedules a round-robin as a batch and rates models as matches finish
+
+    The batch ``results.jsonl`` doubles as the checkpoint: running again with
+    the same output directory skips every match already in it and replays
+    those results, in order, into the ratings.
+    """
+
+    def __init__(self, models: List[str], topics: List[str], output_dir: str, rounds: int = 2,
+                 max_concurrency: int = 8, per_provider_concurrency: int = 4, judge_model: str = "kimi-k2",
+                 cache: ResponseCache = None, dialogue_options: Dict[str, Any] = None, k_factor: float = 32.0):
+        if len(models) < 2:
+            raise ValueError("A tournament needs at least two models")
+        self.schedule = build_schedule(models, topics or [DEFAULT_MESSAGE], rounds)
+        self.output_dir = output_dir
+        self.runner = BatchRunner(output_dir, max_concurrency, per_provider_concurrency,
+                                  judge_model, cache, dialogue_options)
+        self.elo = EloTable(k_factor)
+        for model in models:
+            self.elo.add(model)
+        self.ratings_path = os.path.join(output_dir, "ratings.json")
+
+    def _load_checkpoint(self) -> set:
+        """Replay finished matches from an earlier run and return their ids"""
+        done = set()
+        path = os.path.join(self.output_dir, "results.jsonl")
+        if not os.path.exists(path):
+            return done
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        for line in content.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves at most one torn line
+                continue
+            # Failed and unrated matches are played again on the next run
+            if record.get("status") not in REPLAYED_STATUSES:
+                done.add(record["id"])
+                self._rate(record)
+        if content and not content.endswith("\n"):
+            # Start new records on a fresh line after a torn one
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n")
+        return done
+
+    def _rate(self, record: Dict[str, Any]):
+        outcome = match_outcome(record)
+        if outcome is not None:
+            self.elo.update(record["llm1"], record["llm2"], outcome)
+
+    def _record_finished(self, record: Dict[str, Any]):
+        if record["status"] != "failed" and match_outcome(record) is None:
+            record["status"] = "unrated"
+            record["error"] = "the judge gave no participant scores"
+        self._rate(record)
+        with open(self.ratings_path, "w", encoding="utf-8") as f:
+            json.dump(self.elo.standings(), f, ensure_ascii=False, indent=2)
+
+    async def arun(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Play the matches not yet in the checkpoint; returns the batch summary and standings"""
+        done = self._load_checkpoint()
+        jobs = [job for job in self.schedule if job.id not in done]
+        summary = await self.runner.arun(jobs, append=True, on_record=self._record_finished)
+        summary["skipped"] = len(self.schedule) - len(jobs)
+        return summary, self.elo.standings()
+
+    def run(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        return asyncio.run(self.arun())
@@ -0,0 +1,180 @@
+"""
+Transcript - Versioned JSONL transcripts: durable writer, streaming reader and text converter
+"""
+
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List
+
+# A transcript is one JSON record per line: a header with the format name,
+# version and dialogue metadata, then one "message" record per history entry,
+# optionally followed by an "evaluation" record. Readers skip record types
+# they do not know, so new types do not need a version bump.
+FORMAT_NAME = "llm-dialogue-transcript"
+FORMAT_VERSION = 1
+
+# always: fsync after every turn; batch: fsync every ``sync_every`` turns;
+# never: leave syncing to the OS. Every turn is written and flushed to the
+# OS straight away, so a crash or Ctrl-C of this process never loses a
+# completed turn; the policy only decides how much a power loss can.
+FSYNC_POLICIES = ("always", "batch", "never")
+
+def _header(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "header", "format": FORMAT_NAME, "version": FORMAT_VERSION,
+            "started": round(time.time(), 3), **fields}
+
+def _line(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+def _drop_torn_tail(path: str, block_size: int = 4096):
+    """Cut off a partial last line left by a crash, so new records start on a line of their own"""
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(block_size, position)
+            f.seek(position - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                position += newline + 1 - step
+                break
+            position -= step
+        if position < end:
+            f.truncate(position)
+
+class TranscriptWriter:
+    """Durable, append-only JSONL transcript of a dialogue
+
+    Writes the header when the file is new, then one message record per
+    turn. The writer keeps no turns in memory, but the dialogue still holds
+    its whole history, so memory use is not bounded by the writer.
+    """
+
+    def __init__(self, path: str, fsync: str = "batch", sync_every: int = 8, header: Dict[str, Any] = None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}. Available: {list(FSYNC_POLICIES)}")
+        self.path = path
+        self.fsync = fsync
+        self.sync_every = max(1, sync_every)
+        if os.path.exists(path):
+            _drop_torn_tail(path)
+        # Continue the message numbering of a transcript being resumed
+        self.turns_written = sum(1 for _ in iter_messages(path)) if os.path.exists(path) else 0
+        self._unsynced = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() == 0:
+            self._write(_header(header or {}))
+            self._sync()
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(_line(record))
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def append(self, entry: Dict[str, Any]):
+        """Write one turn"""
+        self._write({"type": "message", "index": self.turns_written, **entry})
+        self.turns_written += 1
+        self._unsynced += 1
+        if self.fsync == "always" or (self.fsync == "batch" and self._unsynced >= self.sync_every):
+            self._sync()
+
+    def append_record(self, record_type: str, **fields: Any):
+        """Write a record that is not a message, e.g. the evaluation"""
+        self._write({"type": record_type, **fields})
+        self._unsynced += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._unsynced and self.fsync != "never":
+            self._sync()
+        self._file.close()
+
+def write_transcript(path: str, header: Dict[str, Any], messages: List[Dict[str, Any]],
+                     evaluation: Dict[str, Any] = None) -> str:
+    """Write a complete transcript in one go, replacing any existing file"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_line(_header(header)))
+        for index, message in enumerate(messages):
+            f.write(_line({"type": "message", "index": index, **message}))
+        if evaluation is not None:
+            f.write(_line({"type": "evaluation", "evaluation": evaluation}))
+    return path
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the records of a JSONL transcript one line at a time
+
+    Lines that are not valid JSON are skipped: a crash mid-write leaves a
+    torn last line, and appending after it used to glue records onto it.
+    Transcripts written before the format was versioned call messages
+    "turn"; they are read as version 0.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if line_number == 1 and record.get("type") == "header":
+                version = record.get("version", 0)
+                if version > FORMAT_VERSION:
+                    raise ValueError(f"{path}: transcript format version {version} is newer than "
+                                     f"the supported version {FORMAT_VERSION}")
+            if record.get("type") == "turn":
+                record["type"] = "message"
+            yield record
+
+def read_header(path: str) -> Dict[str, Any]:
+    """The header record of a JSONL transcript, or {} if it has none"""
+    for record in iter_records(path):
+        return record if record.get("type") == "header" else {}
+    return {}
+
+def iter_messages(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the history entries (role, speaker, content, metrics) of a JSONL transcript"""
+    for record in iter_records(path):
+        if record.get("type") == "message":
+            yield {key: value for key, value in record.items() if key not in ("type", "index")}
+
+def read_transcript(path: str) -> List[Dict[str, Any]]:
+    """All history entries of a JSONL transcript"""
+    return list(iter_messages(path))
+
+def parse_text_transcript(content: str) -> List[Dict[str, Any]]:
+    """Split a dialogue saved in the old text format into history entries
+
+    Speakers are taken from the "LLM Dialogue: A vs B" header, so a turn
+    may span several paragraphs.
+    """
+    header, _, body = content.partition("\n" + "=" * 50 + "\n")
+    speakers = ["User", "System"] + header.replace("LLM Dialogue:", "").strip().split(" vs ")
+    pattern = "|".join(re.escape(speaker) for speaker in speakers)
+    parts = re.split(rf"(?:^|\n\n)({pattern}): ", body.strip())
+    roles = {"User": "user", "System": "system"}
+    return [{"role": roles.get(parts[i], "assistant"), "content": parts[i + 1].strip(), "speaker": parts[i]}
+            for i in range(1, len(parts) - 1, 2)]
+
+def load_transcript(path: str) -> List[Dict[str, Any]]:
+    """Read the history of a JSONL transcript or of a dialogue saved in the old text format"""
+    if path.endswith(".jsonl"):
+        return read_transcript(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_text_transcript(f.read())
+
+def convert_text_transcript(text_path: str, jsonl_path: str = None) -> str:
+    """Convert a dialogue saved in the old text format to a JSONL transcript"""
+    jsonl_path = jsonl_path or os.path.splitext(text_path)[0] + ".jsonl"
+    with open(text_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    names = content.split("\n", 1)[0].replace("LLM Dialogue:", "").strip().split(" vs ")
+    header = {"llm1": names[0], "llm2": names[-1], "converted_from": os.path.basename(text_path)}
+    return write_transcript(jsonl_path, header, parse_text_transcript(content))